@@ -0,0 +1,87 @@
+"""
+Benchmark of task tree traversal.
+
+Compares the previous recursive traversal with list based visited check
+and the iterative dfs from todos.models.utils on random and deep trees.
+
+Run from the repository root:
+    python -m benchmarks.dfs_traversal
+"""
+import gc
+import random
+import sys
+import time
+from todos.models.utils import dfs
+
+
+class Node:
+    __slots__ = ('task_id', 'children_one_level')
+
+    def __init__(self, task_id):
+        self.task_id = task_id
+        self.children_one_level = list()
+
+    def to_dict(self):
+        return {'task_id': self.task_id}
+
+
+def random_tree(size):
+    nodes = [Node(x) for x in range(size)]
+    for x in range(1, size):
+        nodes[random.randrange(x)].children_one_level.append(nodes[x])
+    return nodes[0]
+
+
+def deep_tree(size):
+    nodes = [Node(x) for x in range(size)]
+    for x in range(1, size):
+        nodes[x - 1].children_one_level.append(nodes[x])
+    return nodes[0]
+
+
+def recursive_traversal(node, visited):
+    visited.append(node.to_dict())
+    for child in node.children_one_level:
+        if child not in visited:
+            recursive_traversal(child, visited)
+    return visited
+
+
+def iterative_traversal(node):
+    return [row.to_dict() for row in dfs([node], lambda row: row.children_one_level, key=lambda row: row.task_id)]
+
+
+def measure(func, *args):
+    gc.collect()
+    gc.disable()
+    try:
+        start_time = time.perf_counter()
+        func(*args)
+        return time.perf_counter() - start_time
+    finally:
+        gc.enable()
+
+
+def main():
+    random.seed(0)
+    print(f"{'tree':>6} {'tasks':>8} {'recursive [s]':>14} {'iterative [s]':>14} {'iterative us/task':>18}")
+    for size in (1000, 2000, 4000, 10000, 100000):
+        root = random_tree(size)
+        # quadratic traversal is skipped for large trees, it takes minutes
+        recursive = f"{measure(recursive_traversal, root, list()):14.3f}" if size <= 4000 else f"{'-':>14}"
+        iterative = measure(iterative_traversal, root)
+        print(f"{'random':>6} {size:>8} {recursive} {iterative:14.3f} {iterative / size * 1e6:18.2f}")
+
+    size = 100000
+    root = deep_tree(size)
+    try:
+        recursive = f"{measure(recursive_traversal, root, list()):14.3f}"
+    except RecursionError:
+        recursive = f"{'RecursionError':>14}"
+    iterative = measure(iterative_traversal, root)
+    print(f"{'deep':>6} {size:>8} {recursive} {iterative:14.3f} {iterative / size * 1e6:18.2f}")
+    print(f"recursion limit: {sys.getrecursionlimit()}")
+
+
+if __name__ == '__main__':
+    main()
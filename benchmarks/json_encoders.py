@@ -0,0 +1,78 @@
+"""
+Benchmark of response encoders.
+
+Serializes expanded task trees with status changes, as returned by
+GET /api/v1/tasks?expand=true, with Flask encoder pretty printed (as
+in debug mode before), Flask encoder compact and encoders configured
+by todos.encoders.json_encoder. Reports payload size and throughput.
+
+Run from the repository root:
+    python -m benchmarks.json_encoders
+"""
+import json
+import time
+from collections import namedtuple
+from datetime import datetime, timedelta
+from uuid import uuid4
+from flask.json import JSONEncoder as FlaskJSONEncoder
+from todos.encoders import json_encoder
+from todos.models.definitions import TaskTbl, TaskStatus, Priority
+from todos.models.api.task_tree import TaskTree
+
+Row = namedtuple('Row', [column.name for column in TaskTbl.__table__.columns])
+
+SIZES = (100, 1000, 10000)
+REPEAT = 5
+
+
+def payload(size):
+    """Expanded tree of size tasks, every task has two status changes"""
+    rows, parents = list(), [None]
+    created_ts = datetime(2026, 10, 18)
+    for x in range(size):
+        parent = parents[x // 4] if x >= 4 else None
+        task_id = str(uuid4())
+        path = (parent.path if parent else '') + task_id.replace('-', '')
+        row = Row(task_id=task_id, todolist_id=None, parent_id=parent.task_id if parent else None,
+                  label=f"Task {x}", description='Description of task', status=TaskStatus.active,
+                  priority=Priority.medium, created_ts=created_ts + timedelta(seconds=x), path=path)
+        rows.append(row)
+        parents.append(row)
+    tree = TaskTree(rows)
+    out = tree.to_dicts(tree.descendants(), history=False)
+    for row in out:
+        row['status_changes'] = [{'changed_by': 'Test User', 'change_ts': row['created_ts'], 'status': 'active'}] * 2
+    return out
+
+
+def measure(dumps, data):
+    best = None
+    for x in range(REPEAT):
+        start_time = time.perf_counter()
+        output = dumps(data)
+        duration = time.perf_counter() - start_time
+        best = duration if best is None or duration < best else best
+    return len(output.encode('utf8')), best
+
+
+def main():
+    encoders = (
+        ('flask pretty', lambda data: json.dumps(data, cls=FlaskJSONEncoder, indent=2, separators=(', ', ': '),
+                                                 sort_keys=True)),
+        ('flask compact', lambda data: json.dumps(data, cls=FlaskJSONEncoder, separators=(',', ':'),
+                                                  sort_keys=True)),
+        ('json', lambda data: json.dumps(data, cls=json_encoder({'JSON_ENCODER': 'json'}), indent=2,
+                                         sort_keys=True)),
+        ('orjson', lambda data: json.dumps(data, cls=json_encoder({'JSON_ENCODER': 'orjson'}), indent=2,
+                                           sort_keys=True)),
+    )
+    print(f"{'tasks':>6} {'encoder':>14} {'size [kB]':>10} {'time [ms]':>10} {'tasks/s':>10}")
+    for size in SIZES:
+        data = payload(size)
+        for label, dumps in encoders:
+            length, duration = measure(dumps, data)
+            print(f"{size:>6} {label:>14} {length / 1024:10.1f} {duration * 1e3:10.2f} {size / duration:10.0f}")
+
+
+if __name__ == '__main__':
+    main()
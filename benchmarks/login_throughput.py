@@ -0,0 +1,33 @@
+"""
+Benchmark of password verification throughput.
+
+Measures logins per second of one sync worker for pbkdf2_sha512 hashes
+with different rounds. Verification is cpu bound and blocks the worker
+for its whole duration, so PASSWORD_ROUNDS is the setting to tune.
+
+Run from the repository root:
+    python -m benchmarks.login_throughput
+"""
+import time
+from todos.models.passwords import password_context
+
+LOGINS = 40
+
+
+def inline(ctx, hash):
+    start_time = time.perf_counter()
+    for x in range(LOGINS):
+        assert ctx.verify_and_update('abc123', hash)[0]
+    return LOGINS / (time.perf_counter() - start_time)
+
+
+def main():
+    print(f"{'rounds':>7} {'ms/login':>9} {'logins/s':>9}")
+    for rounds in (1000, 25000, 100000, 200000):
+        ctx = password_context({'PASSWORD_ROUNDS': str(rounds)})
+        logins = inline(ctx, ctx.hash('abc123'))
+        print(f"{rounds:>7} {1e3 / logins:9.2f} {logins:9.1f}")
+
+
+if __name__ == '__main__':
+    main()
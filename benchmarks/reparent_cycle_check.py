@@ -0,0 +1,88 @@
+"""
+Benchmark of reparent cycle check.
+
+Compares enumeration of the moved subtree serialized to dicts with the check
+used by TaskApi.reparent_tasks, the path of the new parent starting with the path
+of the moved task, on wide and deep trees, for moves creating a cycle and moves
+of the subtree to another root. Both rows are read by primary key before the check,
+those two queries don't depend on the tree and are not measured.
+
+Run from the repository root:
+    python -m benchmarks.reparent_cycle_check
+"""
+import gc
+import time
+from collections import namedtuple
+from datetime import datetime
+from uuid import uuid4
+from todos.models.definitions import TaskTbl, TaskStatus, Priority
+from todos.models.api.task_tree import TaskTree
+from todos.models.api.tasks_api import TaskApi
+
+Row = namedtuple('Row', [column.name for column in TaskTbl.__table__.columns])
+
+REPEAT = 20
+
+
+def row(parent):
+    task_id = str(uuid4())
+    path = (parent.path if parent else '') + task_id.replace('-', '')
+    return Row(task_id=task_id, todolist_id=None, parent_id=parent.task_id if parent else None, label=task_id,
+               description=None, status=TaskStatus.active, priority=Priority.low, created_ts=datetime.utcnow(),
+               path=path)
+
+
+def wide_tree(size):
+    """Two roots, the first one with size children"""
+    root, other = row(None), row(None)
+    return [root, other] + [row(root) for x in range(size)]
+
+
+def deep_tree(size):
+    """Two roots, the first one is the top of chain of size tasks"""
+    rows = [row(None), row(None)]
+    parent = rows[0]
+    for x in range(size):
+        parent = row(parent)
+        rows.append(parent)
+    return rows
+
+
+def descendants_check(tree, task_id, new_parent_id):
+    return new_parent_id in [row['task_id'] for row in tree.to_dicts(tree.descendants(task_id), history=False)]
+
+
+def path_check(task, new_parent):
+    return not TaskApi._possible_reparent(task, new_parent.task_id, new_parent)
+
+
+def measure(func, *args):
+    gc.collect()
+    gc.disable()
+    try:
+        start_time = time.perf_counter()
+        for x in range(REPEAT):
+            func(*args)
+        return (time.perf_counter() - start_time) / REPEAT
+    finally:
+        gc.enable()
+
+
+def main():
+    print(f"{'tree':>5} {'tasks':>7} {'move':>6} {'descendants [ms]':>17} {'path [ms]':>15}")
+    for shape, build, sizes in (('wide', wide_tree, (100, 1000, 10000, 100000)), ('deep', deep_tree, (10, 100, 1000))):
+        for size in sizes:
+            rows = build(size)
+            tree = TaskTree(rows)
+            root, other, last = rows[0].task_id, rows[1].task_id, rows[-1].task_id
+            # the first root is moved under its last descendant (cycle) or under the other root
+            for move, new_parent_id in (('cycle', last), ('root', other)):
+                task, new_parent = tree[root].row, tree[new_parent_id].row
+                assert descendants_check(tree, root, new_parent_id) == path_check(task, new_parent)
+                descendants = measure(descendants_check, tree, root, new_parent_id)
+                path = measure(path_check, task, new_parent)
+                print(f"{shape:>5} {size:>7} {move:>6} {descendants * 1e3:17.3f} {path * 1e3:15.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""
+Benchmark of model serializers.
+
+Serializes 10k TaskTbl objects and 10k task rows with column by column
+getattr loop, as DictMixin.to_dict did, and with serializers generated
+by compile_serializer. Objects are transient, so no database is needed,
+is_leaf of objects is queried and it is left out.
+
+Run from the repository root:
+    python -m benchmarks.serializers
+"""
+import gc
+import time
+from collections import namedtuple
+from datetime import datetime, timedelta
+from uuid import uuid4
+from todos.models.definitions import TaskTbl, TaskStatus, Priority
+from todos.models.api.task_tree import TASK_COLUMNS, serialize_row
+
+ROWS = 10000
+REPEAT = 5
+
+Row = namedtuple('Row', [column.name for column in TaskTbl.__table__.columns])
+
+
+def rows(size):
+    created_ts = datetime(2026, 10, 18)
+    out = list()
+    for x in range(size):
+        task_id = str(uuid4())
+        out.append(Row(task_id=task_id, parent_id=None, label=f"Task {x}", description='Description of task',
+                       todolist_id=None, status=TaskStatus.active, priority=Priority.medium,
+                       created_ts=created_ts + timedelta(seconds=x), path=task_id.replace('-', '')))
+    return out
+
+
+def loop_task(task):
+    """TaskTbl.to_dict(history=False) without is_leaf before serializers were generated"""
+    out = dict((column.name, getattr(task, column.name)) for column in task.__table__.columns)
+    out.pop('path')
+    out['status'] = task.status.name
+    out['priority'] = task.priority.name
+    out['depth'] = task.depth
+    return out
+
+
+def loop_row(row):
+    """TaskTree.to_dict row part before serializers were generated"""
+    out = {column.name: getattr(row, column.name) for column in TASK_COLUMNS}
+    out['status'] = row.status.name
+    out['priority'] = row.priority.name
+    return out
+
+
+def measure(serialize, items):
+    best = None
+    for x in range(REPEAT):
+        gc.collect()
+        gc.disable()
+        try:
+            start_time = time.perf_counter()
+            for item in items:
+                serialize(item)
+            duration = time.perf_counter() - start_time
+        finally:
+            gc.enable()
+        best = duration if best is None or duration < best else best
+    return best
+
+
+def main():
+    task_rows = rows(ROWS)
+    tasks = [TaskTbl(**row._asdict()) for row in task_rows]
+    assert [loop_task(task) for task in tasks] == [TaskTbl.serializer_without_leaf(task) for task in tasks]
+    assert [loop_row(row) for row in task_rows] == [serialize_row(row) for row in task_rows]
+
+    print(f"{ROWS} tasks, best of {REPEAT}")
+    print(f"{'input':>8} {'serializer':>10} {'time [ms]':>10} {'rows/s':>10}")
+    for label, serialize, items in (('TaskTbl', loop_task, tasks),
+                                    ('TaskTbl', TaskTbl.serializer_without_leaf, tasks),
+                                    ('row', loop_row, task_rows),
+                                    ('row', serialize_row, task_rows)):
+        kind = 'loop' if serialize in (loop_task, loop_row) else 'compiled'
+        duration = measure(serialize, items)
+        print(f"{label:>8} {kind:>10} {duration * 1e3:10.2f} {ROWS / duration:10.0f}")
+
+
+if __name__ == '__main__':
+    main()
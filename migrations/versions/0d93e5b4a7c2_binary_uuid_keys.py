@@ -0,0 +1,183 @@
+"""binary uuid keys
+
+Revision ID: 0d93e5b4a7c2
+Revises: f41c8a2e7b03
+Create Date: 2026-10-18 19:46:12.305817
+
+Keys are converted from CHAR(36) to BINARY(16) with shadow columns, tables stay readable and writable
+except for the cutover:
+- shadow BINARY(16) columns are added instantly, BEFORE INSERT/UPDATE triggers keep them in sync
+  and rows written before are filled in small batches,
+- each table is rebuilt online (ALGORITHM=INPLACE, LOCK=NONE) with primary key, indexes and foreign keys
+  on shadow columns, old key columns become nullable,
+- cutover: triggers are dropped and columns renamed, shadow columns become keys. It changes metadata only
+  and takes seconds, but application reading CHAR(36) keys can't run after it and application reading
+  BINARY(16) keys can't run before it, so workers are stopped for the cutover (a short downtime)
+  and started with the new version after it,
+- old columns and indexes are dropped online, foreign keys and indexes get their names back.
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '0d93e5b4a7c2'
+down_revision = 'f41c8a2e7b03'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 10000
+
+# table -> key columns, primary key
+TABLES = {
+    'User': (['user_id'], ['user_id']),
+    'TodoList': (['todolist_id'], ['todolist_id']),
+    'TodoListStatusChangeLog': (['todolist_id', 'changed_by'], ['todolist_id', 'change_ts']),
+    'TodoListCreator': (['todolist_id', 'created_by'], ['todolist_id']),
+    'UserTodoList': (['user_id', 'todolist_id'], ['user_id', 'todolist_id']),
+    'Task': (['task_id', 'parent_id', 'todolist_id'], ['task_id']),
+    'TaskStatusChangeLog': (['task_id', 'changed_by'], ['task_id', 'change_ts']),
+    'TaskCount': (['todolist_id'], ['todolist_id']),
+    'TaskClosure': (['ancestor_id', 'descendant_id'], ['ancestor_id', 'descendant_id']),
+    'TaskChildCount': (['task_id'], ['task_id']),
+}
+
+NULLABLE = {('Task', 'parent_id')}
+
+# indexes with key columns and other columns, single key indexes are recreated together with foreign keys
+INDEXES = [
+    ('ix_TodoList_priority_status_label_created_ts_todolist_id', 'TodoList',
+     ['priority', 'status', 'label', 'created_ts', 'todolist_id']),
+    ('ix_UserTodoList_todolist_id_role_user_id', 'UserTodoList', ['todolist_id', 'role', 'user_id']),
+    ('ix_Task_todolist_id', 'Task', ['todolist_id']),
+    ('ix_Task_todolist_id_parent_id_order', 'Task',
+     ['todolist_id', 'parent_id', 'priority', 'status', 'label', 'created_ts']),
+    ('ix_TaskClosure_descendant_id_distance', 'TaskClosure', ['descendant_id', 'distance']),
+]
+
+FOREIGN_KEYS = [
+    ('fk_TodoListStatusChangeLog_todolist_id_TodoList', 'TodoListStatusChangeLog', 'todolist_id', 'TodoList',
+     'todolist_id'),
+    ('fk_TodoListStatusChangeLog_changed_by_User', 'TodoListStatusChangeLog', 'changed_by', 'User', 'user_id'),
+    ('fk_TodoListCreator_todolist_id_TodoList', 'TodoListCreator', 'todolist_id', 'TodoList', 'todolist_id'),
+    ('fk_TodoListCreator_created_by_User', 'TodoListCreator', 'created_by', 'User', 'user_id'),
+    ('fk_UserTodoList_user_id_User', 'UserTodoList', 'user_id', 'User', 'user_id'),
+    ('fk_UserTodoList_todolist_id_TodoList', 'UserTodoList', 'todolist_id', 'TodoList', 'todolist_id'),
+    ('fk_Task_parent_id_Task', 'Task', 'parent_id', 'Task', 'task_id'),
+    ('fk_Task_todolist_id_TodoList', 'Task', 'todolist_id', 'TodoList', 'todolist_id'),
+    ('fk_TaskStatusChangeLog_task_id_Task', 'TaskStatusChangeLog', 'task_id', 'Task', 'task_id'),
+    ('fk_TaskStatusChangeLog_changed_by_User', 'TaskStatusChangeLog', 'changed_by', 'User', 'user_id'),
+    ('fk_TaskCount_todolist_id_TodoList', 'TaskCount', 'todolist_id', 'TodoList', 'todolist_id'),
+    ('fk_TaskClosure_ancestor_id_Task', 'TaskClosure', 'ancestor_id', 'Task', 'task_id'),
+    ('fk_TaskClosure_descendant_id_Task', 'TaskClosure', 'descendant_id', 'Task', 'task_id'),
+    ('fk_TaskChildCount_task_id_Task', 'TaskChildCount', 'task_id', 'Task', 'task_id'),
+]
+
+
+def task_path_trigger(segment):
+    return f"""
+        CREATE TRIGGER TaskPath BEFORE INSERT ON Task
+        FOR EACH ROW
+        BEGIN
+            SET NEW.path = CONCAT(IFNULL((SELECT path FROM Task P WHERE P.task_id = NEW.parent_id), ''),
+                                  {segment});
+        END
+    """
+
+
+def fill(table, column, convert):
+    """Fills shadow column in batches, each batch is a short transaction"""
+    connection = op.get_bind()
+    while True:
+        result = connection.execute(f"UPDATE `{table}` SET `{column}_new` = {convert.format(f'`{column}`')} "
+                                    f"WHERE `{column}_new` IS NULL AND `{column}` IS NOT NULL LIMIT {BATCH_SIZE}")
+        if not result.rowcount:
+            break
+
+
+def index_exists(table, name):
+    return op.get_bind().execute("SELECT 1 FROM information_schema.statistics WHERE table_schema = DATABASE() "
+                                 "AND table_name = %s AND index_name = %s LIMIT 1", (table, name)).first() is not None
+
+
+def online(table, changes):
+    """Alters table without blocking reads and writes, it waits only for metadata lock at start and end"""
+    op.execute(f"ALTER TABLE `{table}` " + ', '.join(changes) + ", ALGORITHM=INPLACE, LOCK=NONE")
+
+
+def convert_keys(old_type, new_type, convert, path_segment):
+    # phase 1: shadow columns kept in sync by triggers, rows written before are filled in batches
+    for table, (columns, primary_key) in TABLES.items():
+        op.execute(f"ALTER TABLE `{table}` " +
+                   ', '.join(f"ADD COLUMN `{column}_new` {new_type} NULL" for column in columns) +
+                   ", ALGORITHM=INSTANT")
+        sync = '; '.join(f"SET NEW.`{column}_new` = {convert.format(f'NEW.`{column}`')}" for column in columns)
+        for event in ('Insert', 'Update'):
+            op.execute(f"CREATE TRIGGER `{table}Keys{event}` BEFORE {event.upper()} ON `{table}` "
+                       f"FOR EACH ROW BEGIN {sync}; END")
+        for column in columns:
+            fill(table, column, convert)
+
+    # phase 2: keys, indexes and foreign keys on shadow columns, each table is rebuilt once online,
+    # old primary key stays as index until cutover, foreign keys on old columns need it
+    for table, (columns, primary_key) in TABLES.items():
+        changes = ['DROP PRIMARY KEY', f"ADD INDEX `ix_{table}_old_key` (" +
+                   ', '.join(f"`{column}`" for column in primary_key) + ")"]
+        for column in columns:
+            null = 'NULL' if (table, column) in NULLABLE else 'NOT NULL'
+            changes.append(f"MODIFY COLUMN `{column}` {old_type} NULL")
+            changes.append(f"MODIFY COLUMN `{column}_new` {new_type} {null}")
+        changes.append("ADD PRIMARY KEY (" + ', '.join(f"`{column}_new`" for column in primary_key) + ")")
+        for name, index_table, index_columns in INDEXES:
+            if index_table == table:
+                changes.append(f"ADD INDEX `{name}_new` (" + ', '.join(
+                    f"`{column}_new`" if column in columns else f"`{column}`" for column in index_columns) + ")")
+        online(table, changes)
+
+    # foreign keys are added without validation, shadow columns hold the same keys as validated old ones
+    op.execute('SET SESSION FOREIGN_KEY_CHECKS = 0')
+    for name, table, column, referred_table, referred_column in FOREIGN_KEYS:
+        online(table, [f"ADD CONSTRAINT `{name}_new` FOREIGN KEY (`{column}_new`) "
+                       f"REFERENCES `{referred_table}` (`{referred_column}_new`) ON DELETE CASCADE"])
+    op.execute('SET SESSION FOREIGN_KEY_CHECKS = 1')
+    for name, table, column, referred_table, referred_column in FOREIGN_KEYS:
+        online(table, [f"DROP FOREIGN KEY `{name}`"])
+
+    # phase 3: cutover, metadata only, workers are stopped meanwhile
+    for table, (columns, primary_key) in TABLES.items():
+        op.execute(f"DROP TRIGGER `{table}KeysInsert`")
+        op.execute(f"DROP TRIGGER `{table}KeysUpdate`")
+        online(table, [f"RENAME COLUMN `{column}` TO `{column}_old`, RENAME COLUMN `{column}_new` TO `{column}`"
+                       for column in columns])
+    op.execute('DROP TRIGGER IF EXISTS TaskPath')
+    op.execute(task_path_trigger(path_segment))
+
+    # phase 4: old columns are dropped online, foreign keys and indexes get their names back
+    for table, (columns, primary_key) in TABLES.items():
+        changes = [f"DROP INDEX `ix_{table}_old_key`"]
+        changes.extend(f"DROP INDEX `{name}`" for name, index_table, index_columns in INDEXES if index_table == table)
+        changes.extend(f"DROP INDEX `{name}`" for name, fk_table, *_ in FOREIGN_KEYS
+                       if fk_table == table and index_exists(table, name))
+        changes.extend(f"DROP COLUMN `{column}_old`" for column in columns)
+        online(table, changes)
+        changes = [f"RENAME INDEX `{name}_new` TO `{name}`"
+                   for name, index_table, index_columns in INDEXES if index_table == table]
+        changes.extend(f"RENAME INDEX `{name}_new` TO `{name}`" for name, fk_table, *_ in FOREIGN_KEYS
+                       if fk_table == table and index_exists(table, f"{name}_new"))
+        if changes:
+            online(table, changes)
+
+    op.execute('SET SESSION FOREIGN_KEY_CHECKS = 0')
+    for name, table, column, referred_table, referred_column in FOREIGN_KEYS:
+        online(table, [f"DROP FOREIGN KEY `{name}_new`",
+                       f"ADD CONSTRAINT `{name}` FOREIGN KEY (`{column}`) "
+                       f"REFERENCES `{referred_table}` (`{referred_column}`) ON DELETE CASCADE"])
+    op.execute('SET SESSION FOREIGN_KEY_CHECKS = 1')
+
+
+def upgrade():
+    # paths don't change, hex of binary key is uuid without dashes
+    convert_keys('CHAR(36)', 'BINARY(16)', 'UUID_TO_BIN({})', 'LOWER(HEX(NEW.task_id))')
+
+
+def downgrade():
+    convert_keys('BINARY(16)', 'CHAR(36)', 'BIN_TO_UUID({})', "REPLACE(NEW.task_id, '-', '')")
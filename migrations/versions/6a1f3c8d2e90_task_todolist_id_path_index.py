@@ -0,0 +1,27 @@
+"""task todolist_id path index
+
+Revision ID: 6a1f3c8d2e90
+Revises: b5c8e2f7a419
+Create Date: 2026-10-18 22:05:47.118306
+
+Subtrees are always read inside todolist, ix_Task_path is replaced by ix_Task_todolist_id_path,
+so ranges of paths are read within todolist only. Indexes are built online.
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '6a1f3c8d2e90'
+down_revision = 'b5c8e2f7a419'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute('ALTER TABLE Task ADD INDEX ix_Task_todolist_id_path (todolist_id, path), ALGORITHM=INPLACE, LOCK=NONE')
+    op.drop_index('ix_Task_path', table_name='Task')
+
+
+def downgrade():
+    op.execute('ALTER TABLE Task ADD INDEX ix_Task_path (path), ALGORITHM=INPLACE, LOCK=NONE')
+    op.drop_index('ix_Task_todolist_id_path', table_name='Task')
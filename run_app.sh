@@ -1,3 +1,3 @@
 #!/usr/bin/env bash
 
-gunicorn todos.app:application --workers 4 -b 127.0.0.1:5000
+gunicorn todos.app:application --workers 4 -b 127.0.0.1:5000 --pid logs/gunicorn.pid
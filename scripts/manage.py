@@ -1,9 +1,12 @@
 import click
 from todos import Todos, db
+from flask import current_app
 from flask.cli import FlaskGroup, with_appcontext
 
 from todos.config import get_config
+import os
 import re
+import signal
 import subprocess
 import sys
 
@@ -42,3 +45,27 @@ def connect():
         sys.exit(1)
 
     return
+
+
+@main.command('dump-spec', help='Write api documentation to json file for static serving.')
+@click.option('--output', default='api_spec.json', show_default=True, help='Output file.')
+@with_appcontext
+def dump_spec(output):
+    spec = current_app.extensions['api_spec']
+    with open(output, 'wb') as f:
+        f.write(spec.content)
+    click.echo(f"Api documentation written to {output}, etag {spec.etag}.")
+
+
+@main.command('reload-roles', help='Recycle gunicorn workers gracefully, new workers load roles again.')
+@click.option('--pidfile', default='logs/gunicorn.pid', show_default=True, help='Gunicorn master pid file.')
+def reload_roles(pidfile):
+    try:
+        with open(pidfile) as f:
+            pid = int(f.read())
+        # gunicorn master restarts workers gracefully, new workers load roles before the first request
+        os.kill(pid, signal.SIGHUP)
+    except (OSError, ValueError) as e:
+        click.echo(e)
+        sys.exit(1)
+    click.echo(f"Workers of gunicorn master {pid} recycled.")
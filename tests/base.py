@@ -1,5 +1,6 @@
 import os
 import unittest
+from contextlib import contextmanager
 from flask_sqlalchemy import event
 from sqlalchemy.engine import Engine
 from sqlite3 import Connection
@@ -8,6 +9,21 @@ from todos import Todos
 from todos.models import db
 
 
+@contextmanager
+def count_statements():
+    """Collects sql statements executed inside with block, the list can be cleared to count again"""
+    statements = list()
+
+    def collect(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', collect)
+    try:
+        yield statements
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', collect)
+
+
 class TestCaseWithDB(unittest.TestCase):
     @classmethod
     def setUpClass(cls):
@@ -2,10 +2,15 @@ import os
 from flask import Flask, abort
 from flask_swagger_ui import get_swaggerui_blueprint
 from todos.config import setup_logging, get_config
-from todos.models.api.user_api import UserApi
+from todos.encoders import json_encoder
+from todos.models.api.roles import RoleCache, forget_roles
+from todos.models.api import user_cache
+from todos.models.passwords import password_context
 from todos.models import db, migrate
 from flask_login import LoginManager
 from todos.views import api_spec, user_bp, login_bp, logout_bp, todolist_bp, task_bp
+from todos.views.api_spec import ApiSpec
+from tools import UUIDConverter
 
 setup_logging()
 login_manager = LoginManager()
@@ -20,6 +25,9 @@ class Todos:
         # load config
         self.load_config()
 
+        # ids in paths are converted to canonical uuid strings
+        self.app.url_map.converters['uuid'] = UUIDConverter
+
         # register blueprints
         self.app.register_blueprint(api_spec)
         self.app.register_blueprint(login_bp)
@@ -33,6 +41,25 @@ class Todos:
         db.init_app(self.app)
         migrate.init_app(self.app)
 
+        # roles are cached in process and loaded before the first request of worker
+        self.app.extensions['roles'] = RoleCache(ttl=int(self.app.config.get('ROLE_CACHE_TTL', 300)))
+        self.app.before_first_request(self.app.extensions['roles'].reload)
+
+        # todolist roles are memoized on flask.g, which outlives request if app context is pushed outside of it
+        self.app.before_request(forget_roles)
+
+        # passwords are hashed and verified with hashing settings of this app
+        self.app.extensions['passwords'] = password_context(self.app.config)
+
+        # logged users are read by primary key, optionally cached in redis shared by workers
+        self.app.extensions['users'] = user_cache.UserCache.from_config(self.app.config)
+
+        # api documentation is built on the first request and served from memory
+        self.app.extensions['api_spec'] = ApiSpec(max_age=int(self.app.config.get('API_SPEC_MAX_AGE', 3600)))
+
+        # responses of jsonify are encoded with orjson when it is installed
+        self.app.json_encoder = json_encoder(self.app.config)
+
         # initialize login manager
         login_manager.init_app(self.app)
         login_manager.login_view = "login_bp"
@@ -43,8 +70,7 @@ class Todos:
 
     @login_manager.user_loader
     def load_user(user_id):
-        user_api = UserApi()
-        return user_api.read_user_by_user_id(user_id)
+        return user_cache.load_user(user_id)
 
     @login_manager.unauthorized_handler
     def unauthorized():
@@ -0,0 +1,98 @@
+from datetime import date, datetime, time, timezone
+from enum import Enum
+from flask.json import JSONEncoder as FlaskJSONEncoder
+from tools import boolean
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+WEEKDAYS = ('Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun')
+MONTHS = ('Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec')
+TWO_DIGITS = tuple(f"{x:02d}" for x in range(60))
+
+# day ordinal -> formatted date, timestamps of responses fall on few days
+day_prefixes = dict()
+
+
+def http_date(o):
+    """
+    Formats date or datetime as werkzeug http_date used by Flask encoder, naive datetimes are in UTC.
+    Date part is formatted once per day, so a timestamp costs a few lookups.
+    """
+    if not isinstance(o, datetime):
+        o = datetime.combine(o, time())
+    elif o.tzinfo is not None:
+        o = o.astimezone(timezone.utc)
+    day = o.toordinal()
+    prefix = day_prefixes.get(day)
+    if prefix is None:
+        if len(day_prefixes) > 10000:
+            day_prefixes.clear()
+        prefix = day_prefixes[day] = f"{WEEKDAYS[o.weekday()]}, {o.day:02d} {MONTHS[o.month - 1]} {o.year:04d} "
+    return f"{prefix}{TWO_DIGITS[o.hour]}:{TWO_DIGITS[o.minute]}:{TWO_DIGITS[o.second]} GMT"
+
+
+class JSONEncoder(FlaskJSONEncoder):
+    """
+    Response encoder of jsonify with the same output as Flask encoder for datetimes and uuids,
+    Enum members are serialized by name as in api schemas. Indentation requested by jsonify in debug mode
+    is used only if pretty is set, compact json is smaller and faster to produce.
+    """
+    pretty = False
+
+    def default(self, o):
+        if isinstance(o, Enum):
+            return o.name
+        if isinstance(o, date):
+            return http_date(o)
+        return super().default(o)
+
+    def encode(self, o):
+        if not self.pretty:
+            self.indent = None
+            self.item_separator, self.key_separator = ',', ':'
+        return super().encode(o)
+
+
+class ORJSONEncoder(JSONEncoder):
+    """
+    JSONEncoder serializing with orjson, datetimes are passed to default to keep Flask format.
+    Payloads come from generated serializers which already write enums by name, orjson itself
+    writes Enum members by value and it has no hook to change it.
+    """
+
+    def encode(self, o):
+        option = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if self.pretty and self.indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(o, default=self.orjson_default, option=option).decode('utf8')
+
+    @staticmethod
+    def orjson_default(o):
+        if isinstance(o, date):
+            return http_date(o)
+        if hasattr(o, '__html__'):
+            return str(o.__html__())
+        raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+
+ENCODERS = {'json': JSONEncoder, 'orjson': ORJSONEncoder}
+
+
+def json_encoder(config):
+    """
+    Returns encoder class configured by JSON_ENCODER (json, orjson or auto - orjson if installed)
+    and Flask JSONIFY_PRETTYPRINT_REGULAR (false by default, not implied by debug mode)
+    """
+    name = config.get('JSON_ENCODER') or 'auto'
+    if name == 'auto':
+        name = 'orjson' if orjson is not None else 'json'
+    if name == 'orjson' and orjson is None:
+        raise ImportError('JSON_ENCODER orjson requires orjson package')
+    pretty = boolean(str(config.get('JSONIFY_PRETTYPRINT_REGULAR', False)).lower()) is True
+    return type(ENCODERS[name].__name__, (ENCODERS[name],), {'pretty': pretty})
@@ -0,0 +1,59 @@
+from todos.models.base import compile_serializer
+from todos.models.definitions import (db, TodoListTbl, TaskTbl, UserTodoListTbl, TodoListStatus, Priority,
+                                      TODOLIST_ORDER)
+from todos.models.pagination import Page, after as after_cursor, decode_cursor, paginate
+from todos.schemas.todolists import TodoListGet
+from todos.schemas.tasks import TaskGet
+
+
+class ReadQuery:
+    """
+    Read only query of model which selects only columns exposed by api schema as tuples, rows are
+    serialized by generated serializer without building model objects in session. Internal columns
+    are selected too but not serialized. Write paths pass orm=True and get model objects.
+    """
+
+    def __init__(self, model, schema, names=(), internal=()):
+        self.model = model
+        fields = schema().fields
+        self.columns = [column for column in model.__table__.columns if column.name in fields]
+        self.internal = [model.__table__.columns[name] for name in internal]
+        self.serialize = compile_serializer(self.columns, names=names)
+
+    def query(self, *criterion, orm=False):
+        if orm:
+            return db.session.query(self.model).filter(*criterion)
+        return db.session.query(*self.columns, *self.internal).filter(*criterion)
+
+
+TODOLISTS = ReadQuery(TodoListTbl, TodoListGet, names=('status', 'priority'))
+
+# path is used by task tree only
+TASKS = ReadQuery(TaskTbl, TaskGet, names=('status', 'priority'), internal=('path',))
+
+
+def todolist_by_id(todolist_id, history=True):
+    """Returns list with serialized todolist or empty list if it doesn't exist"""
+    return TodoListTbl.to_dicts(TODOLISTS.query(TodoListTbl.todolist_id == todolist_id), history=history)
+
+
+def user_todolists(user_id, label=None, status=None, priority=None, history=True, limit=None, after=None):
+    """
+    Returns todolists of user filtered and ordered by one query, status changes are loaded with another one.
+    With limit only one page is returned, its cursor is passed as after to get the next one.
+    """
+    todolists = TODOLISTS.query(UserTodoListTbl.user_id == user_id). \
+        join(UserTodoListTbl, UserTodoListTbl.todolist_id == TodoListTbl.todolist_id)
+    if label:
+        todolists = todolists.filter(TodoListTbl.label == label)
+    if status:
+        todolists = todolists.filter(TodoListTbl.status == getattr(TodoListStatus, status))
+    if priority:
+        todolists = todolists.filter(TodoListTbl.priority == getattr(Priority, priority))
+    if after:
+        todolists = todolists.filter(after_cursor(TODOLIST_ORDER, decode_cursor(after, TODOLIST_ORDER)))
+    todolists = todolists.order_by(*TODOLIST_ORDER)
+    if limit:
+        todolists = todolists.limit(limit + 1)
+    page = paginate(todolists, limit, TODOLIST_ORDER)
+    return Page(TodoListTbl.to_dicts(page, history=history), page.cursor)
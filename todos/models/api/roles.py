@@ -0,0 +1,61 @@
+import time
+import logging
+from flask import current_app, g
+from todos.models.definitions import db, RoleTbl, UserTodoListTbl
+
+logger = logging.getLogger('todos')
+
+# roles are cached as plain rows, they don't belong to any session and don't expire on commit
+ROLE_COLUMNS = RoleTbl.__table__.columns
+
+
+class RoleCache:
+    """
+    Permissions and limits of all roles kept in process. Roles are loaded with one query
+    and reloaded after ttl seconds, explicitly by reload or when unknown role is requested.
+    """
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self.roles = dict()
+        self.expires = 0
+
+    def reload(self):
+        self.roles = {row.role: row for row in db.session.query(*ROLE_COLUMNS)}
+        self.expires = time.monotonic() + self.ttl
+        logger.info(f"Roles loaded: {', '.join(self.roles)}")
+
+    def get(self, role):
+        if time.monotonic() >= self.expires or role not in self.roles:
+            self.reload()
+        return self.roles.get(role)
+
+
+def todolist_role(user_id, todolist_id):
+    """
+    Returns role of user for todolist with its permissions and limits or None if user has no access.
+    Role name is read from UserTodoList by primary key once per request and memoized on flask.g, so permission
+    changes made by any worker apply from the next request. Only static permissions and limits come from the role cache.
+    """
+    roles = g.setdefault('todolist_roles', dict())
+    key = (user_id, todolist_id)
+    if key not in roles:
+        role = db.session.query(UserTodoListTbl.role).filter_by(user_id=user_id, todolist_id=todolist_id).scalar()
+        roles[key] = role_by_name(role) if role else None
+    return roles[key]
+
+
+def forget_roles():
+    """Drops todolist roles memoized for the request, they are read again after permissions change"""
+    g.pop('todolist_roles', None)
+
+
+def role_by_name(role):
+    """Returns permissions and limits of role from the role cache"""
+    return current_app.extensions['roles'].get(role)
+
+
+def reload_roles():
+    """Reloads the role cache of current app, to be called after roles change"""
+    current_app.extensions['roles'].reload()
+    forget_roles()
@@ -0,0 +1,155 @@
+from itertools import islice
+from operator import attrgetter
+from todos.models.utils import dfs
+from todos.models.pagination import after as after_key
+from todos.models.definitions import TaskTbl, TaskStatusChangeLogTbl, PATH_SEGMENT_LENGTH
+from todos.models.api.read_queries import TASKS
+
+
+# the same order as used by task relationships, task_id makes it unique for pagination
+TASK_ORDER = (TaskTbl.priority, TaskTbl.status, TaskTbl.label, TaskTbl.created_ts, TaskTbl.task_id)
+
+# columns exposed by api, path is internal
+TASK_COLUMNS = TASKS.columns
+
+# serializer of task rows without depth and is_leaf, they are taken from the tree
+serialize_row = TASKS.serialize
+
+
+def depth(path):
+    return len(path) // PATH_SEGMENT_LENGTH - 1
+
+
+def with_history(out, history=True):
+    """Adds status changes to serialized tasks, status changes of all tasks are loaded with one query"""
+    if history:
+        status_changes = TaskStatusChangeLogTbl.for_tasks(row['task_id'] for row in out)
+        for row in out:
+            row['status_changes'] = status_changes[row['task_id']]
+    return out
+
+
+def rows_to_dicts(rows, history=True):
+    """Serializes task rows read without tree, is_leaf of all rows is loaded with one query"""
+    parents = TaskTbl.with_children(row.task_id for row in rows)
+    return with_history([dict(serialize_row(row), depth=depth(row.path), is_leaf=row.task_id not in parents)
+                         for row in rows], history)
+
+
+class TaskNode:
+    """
+    Task of TaskTree, row holds all columns of task.
+    """
+    __slots__ = ('task_id', 'parent_id', 'row')
+
+    def __init__(self, row):
+        self.task_id = row.task_id
+        self.parent_id = row.parent_id
+        self.row = row
+
+
+class TaskTree:
+    """
+    Index of tasks of todolist or of one subtree loaded with one query. Nodes are kept in task_id -> node
+    and parent_id -> children dicts, children are in order of TASK_ORDER as sorted by database,
+    so tree operations don't touch the database.
+    """
+
+    def __init__(self, rows=()):
+        self.nodes = dict()
+        self.children = dict()
+        self.add(rows)
+
+    def add(self, rows):
+        """Adds rows, children of one parent are added together in order of TASK_ORDER"""
+        for row in rows:
+            node = self.nodes[row.task_id] = TaskNode(row)
+            self.children.setdefault(row.parent_id, []).append(node)
+
+    @classmethod
+    def load(cls, todolist_id, path=None):
+        """Loads all tasks of todolist or subtree of task with path, it is a range of paths"""
+        rows = TASKS.query(TaskTbl.todolist_id == todolist_id)
+        if path:
+            rows = rows.filter(TaskTbl.path.like(f"{path}%"))
+        # grouped by parent in order of ix_Task_todolist_id_parent_id_order, children keep TASK_ORDER
+        return cls(rows.order_by(TaskTbl.parent_id, *TASK_ORDER))
+
+    @classmethod
+    def load_page(cls, todolist_id, task_id, keys, limit=None):
+        """
+        Loads only tasks of one page of descendants of task_id in dfs order, returns the tree and nodes of the page
+        with one more node if the next page exists. Keys are sort keys of the last task of the previous page
+        and its ancestors below task_id. Following siblings of them are sought in ix_Task_todolist_id_parent_id_order
+        level by level, then children of tasks which can get to the page are loaded one level per query.
+        Siblings are compared by database, so the order is the same as of tree loaded by load.
+        """
+        def children(parent_id, key=None):
+            rows = TASKS.query(TaskTbl.todolist_id == todolist_id, TaskTbl.parent_id == parent_id)
+            if key:
+                rows = rows.filter(after_key(TASK_ORDER, key, inclusive=True))
+            rows = rows.order_by(*TASK_ORDER)
+            return rows.limit(limit + 2).all() if limit else rows.all()
+
+        tree, following, parent_id = cls(), list(), task_id
+        for key in keys:
+            rows = children(parent_id, key)
+            # task of key is found by its task_id, it is missing if it was deleted or moved
+            if not rows or rows[0].task_id != key[-1]:
+                following.append(rows)
+                break
+            tree.add(rows[:1])
+            following.append(rows[1:])
+            parent_id = rows[0].task_id
+        else:
+            following.append(children(parent_id))
+
+        # the deepest siblings come first, their subtrees precede siblings of ancestors
+        roots = [row for rows in reversed(following) for row in rows]
+        tree.add(roots)
+        roots = [tree.nodes[row.task_id] for row in roots]
+        expanded = set()
+        while True:
+            page = list(islice(dfs(roots, lambda node: tree.children_of(node.task_id), key=attrgetter('task_id')),
+                               limit + 1 if limit else None))
+            parent_ids = [node.task_id for node in page if node.task_id not in expanded]
+            if not parent_ids:
+                return tree, page
+            expanded.update(parent_ids)
+            tree.add(TASKS.query(TaskTbl.todolist_id == todolist_id, TaskTbl.parent_id.in_(parent_ids)).
+                     order_by(TaskTbl.parent_id, *TASK_ORDER))
+
+    def __getitem__(self, task_id):
+        return self.nodes[task_id]
+
+    def children_of(self, task_id=None):
+        """Returns children of task_id or roots of todolist if task_id is None"""
+        return self.children.get(task_id, [])
+
+    def descendants(self, task_id=None):
+        """Yields descendants of task_id or all tasks of todolist if task_id is None in dfs order"""
+        return dfs(self.children_of(task_id), lambda node: self.children_of(node.task_id),
+                   key=attrgetter('task_id'))
+
+    def chain(self, task_id, root_id=None):
+        """Returns nodes from the child of root_id down to task_id"""
+        nodes = [self.nodes[task_id]]
+        while nodes[-1].parent_id != root_id:
+            nodes.append(self.nodes[nodes[-1].parent_id])
+        return nodes[::-1]
+
+    def is_leaf(self, task_id):
+        return not self.children.get(task_id)
+
+    def depth(self, task_id):
+        return depth(self.nodes[task_id].row.path)
+
+    def to_dict(self, node):
+        out = serialize_row(node.row)
+        out['depth'] = self.depth(node.task_id)
+        out['is_leaf'] = self.is_leaf(node.task_id)
+        return out
+
+    def to_dicts(self, nodes, history=True):
+        """Serializes nodes like TaskTbl.to_dicts, status changes of all tasks are loaded with one query"""
+        return with_history([self.to_dict(node) for node in nodes], history)
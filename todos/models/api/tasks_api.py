@@ -1,10 +1,17 @@
-from uuid import uuid4
 from datetime import datetime
 import logging
+from sqlalchemy import and_, exists, func, literal, String
 from sqlalchemy.exc import DBAPIError, SQLAlchemyError
+from sqlalchemy.orm import aliased
 from .errors import ExceededLimitError
-from todos.models.definitions import (db, TodoListTbl, UserTbl, TaskTbl, TaskStatusChangeLogTbl,
-                                      TaskDepthTbl, TaskCountTbl, RoleTbl)
+from .task_tree import TaskTree, TASK_ORDER, depth, rows_to_dicts
+from .roles import todolist_role
+from .read_queries import TODOLISTS, TASKS
+from todos.models.definitions import (db, TodoListTbl, TaskTbl, TaskStatusChangeLogTbl, TaskCountTbl,
+                                      TaskStatus, PATH_SEGMENT_LENGTH)
+from todos.models.utils import uuid7
+from todos.models.pagination import (Page, after as after_cursor, decode_cursor, decode_tree_cursor, encode_tree_cursor,
+                                     paginate)
 from tools import timer
 
 
@@ -13,45 +20,98 @@ logger = logging.getLogger('todos')
 
 class TaskApi():
 
-    def __init__(self, user_id, todolist_id):
+    def __init__(self, user_id, todolist_id, role=None):
         self.user_id = user_id
-        self.user = db.session.query(UserTbl).filter_by(user_id=self.user_id).first()
         self.todolist_id = todolist_id
-        self.todolist = db.session.query(TodoListTbl).filter_by(todolist_id=self.todolist_id).first()
-        self.role = db.session.query(RoleTbl).filter_by(role=self.todolist.role(self.user_id)).one()
+        self._todolist = None
+        self._role = role
+
+    @property
+    def todolist(self):
+        """Todolist object is loaded by write paths only, reads select columns"""
+        if self._todolist is None:
+            self._todolist = TODOLISTS.query(TodoListTbl.todolist_id == self.todolist_id, orm=True).first()
+        return self._todolist
+
+    @property
+    def role(self):
+        """Role resolved by view is passed in, otherwise it is taken from the memo of the request"""
+        return self._role or todolist_role(self.user_id, self.todolist_id)
 
     def read_task_by_id(self, task_id):
-        return db.session.query(TaskTbl).filter_by(task_id=task_id).filter_by(todolist_id=self.todolist_id).first()
+        return TASKS.query(TaskTbl.task_id == task_id, TaskTbl.todolist_id == self.todolist_id, orm=True).first()
+
+    def read_task_row(self, task_id):
+        """Returns columns of task of todolist with its path read by primary key or None"""
+        if task_id is None:
+            return
+        return TASKS.query(TaskTbl.task_id == task_id, TaskTbl.todolist_id == self.todolist_id).first()
 
     @timer
-    def get_tasks(self, expand, task_id=None):
+    def get_tasks(self, expand, task_id=None, history=True, limit=None, after=None):
+        """
+        Returns children or descendants of task_id. Children are read by range of ix_Task_todolist_id_parent_id_order,
+        only descendants are walked in TaskTree of the subtree. With limit only one page is returned,
+        its cursor holds sort key of the last task and is passed as after to get the next one.
+        """
+        path = None
         if task_id:
-            task = self.read_task_by_id(task_id)
-            return list(task.descendants) if expand else list(task.children)
+            root = self.read_task_row(task_id)
+            if root is None:
+                return Page([])
+            path = root.path
+
+        if expand:
+            return self._get_descendants(task_id, path, history, limit, after)
+
+        children = TASKS.query(TaskTbl.todolist_id == self.todolist_id, TaskTbl.parent_id == task_id)
+        if after:
+            children = children.filter(after_cursor(TASK_ORDER, decode_cursor(after, TASK_ORDER)))
+        children = children.order_by(*TASK_ORDER)
+        if limit:
+            children = children.limit(limit + 1)
+        page = paginate(children, limit, TASK_ORDER)
+        return Page(rows_to_dicts(page, history=history), page.cursor)
+
+    def _get_descendants(self, task_id, path, history, limit, after):
+        """
+        Descendants in dfs order, cursor holds sort keys of the last task and its ancestors below task_id.
+        Pages load only tasks which can get to them, the whole subtree is loaded without pagination.
+        """
+        if limit or after:
+            keys = decode_tree_cursor(after, TASK_ORDER) if after else []
+            tree, nodes = TaskTree.load_page(self.todolist_id, task_id, keys, limit)
         else:
-            tasks = list(self.todolist.children_tasks)
-            if not tasks:
-                return
-            return list(tasks[0].dfs_tree) if expand else [row.to_dict() for row in self.todolist.children_tasks]
+            tree = TaskTree.load(self.todolist_id, path)
+            nodes = list(tree.descendants(task_id))
+
+        cursor = None
+        if limit and len(nodes) > limit:
+            nodes = nodes[:limit]
+            cursor = encode_tree_cursor([node.row for node in tree.chain(nodes[-1].task_id, task_id)], TASK_ORDER)
+        return Page(tree.to_dicts(nodes, history=history), cursor)
 
     def create_task(self, data):
-        depth = 0
+        task_depth = 0
         task_count = self.todolist.TaskCount.quantity + 1
         if data.get('parent_id', None):
             data['parent_id'] = str(data['parent_id'])
-            parent_obj = db.session.query(TaskTbl).filter_by(task_id=data['parent_id']).one()
-            depth = parent_obj.depth + 1
+            parent = self.read_task_row(data['parent_id'])
+            if parent is None:
+                logger.error(f"Parent task {data['parent_id']} not found in todolist")
+                return
+            task_depth = depth(parent.path) + 1
 
         if task_count > self.role.task_count_limit:
             logger.error(f"Task task count limit ({self.role.task_count_limit}) exceeded")
             return False
 
-        if depth > self.role.task_depth_limit:
+        if task_depth > self.role.task_depth_limit:
             logger.error(f"Task tree depth limit ({self.role.task_depth_limit}) exceeded")
             return False
 
         try:
-            task = TaskTbl(**data, todolist_id=self.todolist_id, task_id=str(uuid4()), created_ts=datetime.utcnow())
+            task = TaskTbl(**data, todolist_id=self.todolist_id, task_id=uuid7(), created_ts=datetime.utcnow())
             db.session.add(task)
             db.session.add(TaskStatusChangeLogTbl(Task=task, changed_by=self.user_id, change_ts=task.created_ts,
                                                   status=data['status']))
@@ -63,13 +123,17 @@ class TaskApi():
             return
 
     def update_task(self, task_id, data):
-        task = self.read_task_by_id(task_id)
-        if not task:
+        task = self.read_task_row(task_id)
+        if task is None:
             return
 
-        # task can have status done if all its descendants are done
+        # task can have status done if all its descendants are done, they are a range of paths
         if data.get('status', None) and data['status'] == 'done':
-            if not all(row['status'] == 'done' for row in task.descendants):
+            not_done_descendant = exists().where(TaskTbl.todolist_id == self.todolist_id). \
+                where(TaskTbl.path.like(f"{task.path}%")). \
+                where(TaskTbl.task_id != task_id). \
+                where(TaskTbl.status != TaskStatus.done)
+            if db.session.query(not_done_descendant).scalar():
                 return False
 
         try:
@@ -85,14 +149,17 @@ class TaskApi():
             return
 
     def delete_task(self, task_id):
-        task = self.read_task_by_id(task_id)
-        if not task:
+        path = db.session.query(TaskTbl.path).filter_by(task_id=task_id, todolist_id=self.todolist_id).scalar()
+        if path is None:
             return
 
         try:
+            # descendants are deleted by cascade, task count drops by size of the whole subtree
+            subtree_size = db.session.query(func.count(TaskTbl.task_id)). \
+                filter(TaskTbl.todolist_id == self.todolist_id, TaskTbl.path.like(f"{path}%")).scalar()
             db.session.query(TaskTbl).filter_by(task_id=task_id).delete()
-            quantity = db.session.query(TaskTbl).filter_by(todolist_id=self.todolist_id).count()
-            db.session.query(TaskCountTbl).filter_by(todolist_id=self.todolist_id).update({'quantity': quantity})
+            db.session.query(TaskCountTbl).filter_by(todolist_id=self.todolist_id). \
+                update({'quantity': TaskCountTbl.quantity - subtree_size}, synchronize_session=False)
             db.session.commit()
             return True
         except (DBAPIError, SQLAlchemyError) as e:
@@ -102,14 +169,29 @@ class TaskApi():
 
     @timer
     def purge_tasks(self):
+        """
+        Deletes done tasks of todolist which have all descendants done.
+        Returns number of deleted tasks or None in case of database error.
+        """
         try:
-            for task in db.session.query(TaskTbl).filter_by(status='done').all():
-                if task.is_leaf or all(row['status'] == 'done' for row in task.dfs_tree_from_object(visited=list())):
-                    db.session.query(TaskTbl).filter_by(task_id=task.task_id).delete()
-            quantity = db.session.query(TaskTbl).filter_by(todolist_id=self.todolist_id).count()
-            db.session.query(TaskCountTbl).filter_by(todolist_id=self.todolist_id).update({'quantity': quantity})
+            # descendants are the range of paths starting with path of task, paths are lowercase hex,
+            # so the range ends before path followed by 'g' and ix_Task_todolist_id_path serves it
+            descendant = aliased(TaskTbl)
+            not_done_descendant = exists().where(descendant.path >= TaskTbl.path). \
+                where(descendant.path < TaskTbl.path.concat('g')). \
+                where(descendant.todolist_id == TaskTbl.todolist_id). \
+                where(descendant.status != TaskStatus.done)
+            # descendants of purged task are purged too, so number of tasks to delete is exact
+            to_delete = [row.task_id for row in db.session.query(TaskTbl.task_id).
+                         filter(TaskTbl.todolist_id == self.todolist_id).
+                         filter(TaskTbl.status == TaskStatus.done).
+                         filter(~not_done_descendant)]
+            if to_delete:
+                db.session.query(TaskTbl).filter(TaskTbl.task_id.in_(to_delete)).delete(synchronize_session=False)
+                db.session.query(TaskCountTbl).filter_by(todolist_id=self.todolist_id). \
+                    update({'quantity': TaskCountTbl.quantity - len(to_delete)}, synchronize_session=False)
             db.session.commit()
-            return True
+            return len(to_delete)
         except (DBAPIError, SQLAlchemyError) as e:
             logger.error(f"Database error: {e}")
             db.session.rollback()
@@ -117,36 +199,36 @@ class TaskApi():
 
     @timer
     def reparent_tasks(self, task_id, new_parent_id):
-        task = self.read_task_by_id(task_id)
-        if not task:
+        task = self.read_task_row(task_id)
+        if task is None:
             return
 
-        if not self._it_is_possible_to_reparent(task_id, new_parent_id):
+        new_parent = self.read_task_row(new_parent_id)
+        if not self._possible_reparent(task, new_parent_id, new_parent):
             return False
 
-        # calculate depth difference
-        depth = 0
-        if new_parent_id:
-            depth = db.session.query(TaskDepthTbl.depth).filter_by(task_id=new_parent_id).scalar() + 1
-        depth_diff = task.depth - depth
+        # paths of the whole subtree start with old prefix, it is replaced with the new one
+        old_prefix = task.path
+        new_prefix = old_prefix[-PATH_SEGMENT_LENGTH:]
+        if new_parent:
+            new_prefix = new_parent.path + new_prefix
+        depth_diff = (len(old_prefix) - len(new_prefix)) // PATH_SEGMENT_LENGTH
+        subtree = and_(TaskTbl.todolist_id == self.todolist_id, TaskTbl.path.like(f"{old_prefix}%"))
 
         try:
-            # raise error if limit exceeded
-            if depth > self.role.task_depth_limit:
+            # raise error if limit exceeded by the deepest task of subtree, it has the longest path
+            max_length = db.session.query(func.max(func.length(TaskTbl.path))).filter(subtree).scalar()
+            max_depth = max_length // PATH_SEGMENT_LENGTH - 1
+            if max_depth - depth_diff > self.role.task_depth_limit:
                 raise ExceededLimitError
 
             # update parent
             db.session.query(TaskTbl).filter_by(task_id=task_id).update({'parent_id': new_parent_id})
 
-            # update depth
-            for task_tree_node in task.dfs_tree_from_object(list()):
-                new_depth = task_tree_node['depth'] - depth_diff
-
-                # raise error if limit exceeded
-                if new_depth > self.role.task_depth_limit:
-                    raise ExceededLimitError
-
-                db.session.query(TaskDepthTbl).filter_by(task_id=task_tree_node['task_id']).update({'depth': new_depth})
+            # rewrite paths of the whole subtree
+            db.session.query(TaskTbl).filter(subtree). \
+                update({'path': literal(new_prefix, String).concat(func.substr(TaskTbl.path, len(old_prefix) + 1))},
+                       synchronize_session=False)
 
             db.session.commit()
             return True
@@ -159,36 +241,23 @@ class TaskApi():
             db.session.rollback()
             return False
 
-    def _it_is_possible_to_reparent(self, task_id, new_parent_id):
-        # task cannot be the parent or None
-        if task_id is None or task_id == new_parent_id:
+    @staticmethod
+    def _possible_reparent(task, new_parent_id, new_parent):
+        # task has to exist and cannot be its own parent
+        if task is None or task.task_id == new_parent_id:
             return False
 
-        task = db.session.query(TaskTbl).filter_by(task_id=task_id).first()
-        if task is None:
+        # new parent has to be task of the same todolist
+        if new_parent_id is not None and new_parent is None:
             return False
 
-        if new_parent_id is None:
-            empty_parent = True
-            new_parent = None
-        else:
-            empty_parent = False
-            new_parent = db.session.query(TaskTbl).filter_by(task_id=new_parent_id).first()
-            # cannont be none after fetching from db
-            if new_parent is None:
-                return False
-
-        # checking if new_parent_id
+        # checking if new parent
         # - it is not current parent of task
-        if (empty_parent and task.parent_id is None) or (new_parent and task.parent_id == new_parent.task_id):
+        if task.parent_id == new_parent_id:
             return False
 
-        # if still empty parent, no additional check is required
-        if empty_parent:
-            return True
-
-        # - it is not one of task descendants
-        if new_parent and any(row['task_id'] == new_parent.task_id for row in task.descendants):
+        # - it is not one of task descendants, their paths start with path of task
+        if new_parent and new_parent.path.startswith(task.path):
             return False
 
         return True
@@ -1,9 +1,11 @@
-from uuid import uuid4
 from datetime import datetime
 import logging
 from sqlalchemy.exc import DBAPIError, SQLAlchemyError
 from todos.models.definitions import (db, TodoListTbl, UserTodoListTbl, TodoListCreatorTbl, TodoListStatusChangeLogTbl,
-                                      UserTbl, RoleTbl, TaskCountTbl)
+                                      UserTbl, TaskCountTbl)
+from todos.models.utils import uuid7
+from todos.models.api.roles import role_by_name, forget_roles
+from todos.models.api.read_queries import TODOLISTS, todolist_by_id, user_todolists
 from tools import timer
 
 
@@ -14,19 +16,28 @@ class TodoListApi():
 
     def __init__(self, user_id):
         self.user_id = user_id
-        self.user = db.session.query(UserTbl).filter_by(user_id=self.user_id).first()
-        self.role = db.session.query(RoleTbl).filter_by(role='owner').one()
+        self._user = None
+
+    @property
+    def user(self):
+        """User object is loaded by write paths only, reads select columns"""
+        if self._user is None:
+            self._user = db.session.query(UserTbl).filter_by(user_id=self.user_id).first()
+        return self._user
+
+    @property
+    def role(self):
+        return role_by_name('owner')
 
     def read_todolist_by_id(self, todolist_id):
-        return db.session.query(TodoListTbl).filter_by(todolist_id=todolist_id).first()
+        return TODOLISTS.query(TodoListTbl.todolist_id == todolist_id, orm=True).first()
 
     @timer
-    def get_todolists(self, todolist_id=None, filters=None):
+    def get_todolists(self, todolist_id=None, filters=None, history=True, limit=None, after=None):
         if todolist_id:
-            todo = db.session.query(TodoListTbl).filter_by(todolist_id=todolist_id).all()
-            return (row.to_dict() for row in todo)
+            return todolist_by_id(todolist_id, history=history)
         else:
-            return self.user.all_todolists(**filters)
+            return user_todolists(self.user_id, **filters, history=history, limit=limit, after=after)
 
     def create_todolist(self, data):
         # todolist limit
@@ -36,7 +47,7 @@ class TodoListApi():
             return False
 
         try:
-            todo = TodoListTbl(**data, todolist_id=str(uuid4()), created_ts=datetime.utcnow())
+            todo = TodoListTbl(**data, todolist_id=uuid7(), created_ts=datetime.utcnow())
             db.session.add(todo)
             db.session.add(TodoListCreatorTbl(todolist_id=todo.todolist_id, created_by=self.user_id))
             db.session.add(UserTodoListTbl(todolist_id=todo.todolist_id, user_id=self.user_id, role='owner'))
@@ -67,6 +78,7 @@ class TodoListApi():
         try:
             db.session.query(TodoListTbl).filter_by(todolist_id=todolist_id).delete()
             db.session.commit()
+            forget_roles()
             return True
         except (DBAPIError, SQLAlchemyError) as e:
             logger.error(f"Database error: {e}")
@@ -88,6 +100,7 @@ class TodoListApi():
                 if new_owner_role:
                     db.session.add(UserTodoListTbl(todolist_id=todolist_id, user_id=self.user_id, role=new_owner_role))
             db.session.commit()
+            forget_roles()
             return True
         except (DBAPIError, SQLAlchemyError) as e:
             logger.error(f"Database error: {e}")
@@ -1,8 +1,10 @@
-from uuid import uuid4
 import logging
 from datetime import datetime
 from todos.models.definitions import db, UserTbl
+from todos.models.utils import uuid7
 from sqlalchemy.exc import DBAPIError, SQLAlchemyError
+from .user_cache import forget_users
+from tools import timer
 
 
 logger = logging.getLogger('todos')
@@ -19,9 +21,26 @@ class UserApi():
     def read_user_by_email(self, email):
         return db.session.query(UserTbl).filter_by(email=email).first()
 
+    def authenticate(self, login, password):
+        """
+        Returns user if credentials match, updated password hash is saved.
+        """
+        user = self.read_user_by_login(login)
+        if not user or not user.is_authenticated(login, password):
+            return
+
+        if db.session.is_modified(user):
+            try:
+                db.session.commit()
+                logger.info(f"Password hash of {login} updated")
+            except (DBAPIError, SQLAlchemyError) as e:
+                logger.error(f"Database error: {e}")
+                db.session.rollback()
+        return user
+
     def create_user(self, data):
         try:
-            user = UserTbl(**data, user_id=str(uuid4()), created=datetime.utcnow())
+            user = UserTbl(**data, user_id=uuid7(), created=datetime.utcnow())
             db.session.add(user)
             db.session.commit()
             return user
@@ -30,10 +49,12 @@ class UserApi():
             db.session.rollback()
             return
 
+    @timer
     def update_user(self, user_id, to_change):
         try:
             db.session.query(UserTbl).filter_by(user_id=user_id).update(to_change)
             db.session.commit()
+            forget_users(user_id)
             return True
         except (DBAPIError, SQLAlchemyError) as e:
             logger.error(f"Database error: {e}")
@@ -44,6 +65,7 @@ class UserApi():
         try:
             db.session.query(UserTbl).filter_by(user_id=user_id).delete()
             db.session.commit()
+            forget_users(user_id)
             return True
         except (DBAPIError, SQLAlchemyError) as e:
             logger.error(f"Database error: {e}")
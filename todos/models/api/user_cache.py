@@ -0,0 +1,131 @@
+import json
+import time
+from collections import OrderedDict
+from threading import Lock
+from flask import current_app
+from flask_login import UserMixin
+from todos.models.definitions import db, UserTbl
+
+
+class LoggedUser(UserMixin):
+    """
+    Identity of logged user, used as current_user instead of UserTbl object.
+    """
+
+    def __init__(self, user_id, login, name, email):
+        self.user_id = user_id
+        self.login = login
+        self.name = name
+        self.email = email
+
+    def get_id(self):
+        return self.user_id
+
+
+class MemoryBackend:
+    """
+    Backend kept in process, at most size users are stored for ttl seconds, least recently used are dropped first.
+    Users forgotten by other workers are seen by this one after ttl, so ttl should be short.
+    """
+
+    def __init__(self, size=1000, ttl=5):
+        self.size = size
+        self.ttl = ttl
+        self.items = OrderedDict()
+        self.lock = Lock()
+
+    def get(self, key):
+        with self.lock:
+            item = self.items.get(key)
+            if item is None:
+                return
+            value, expires = item
+            if time.monotonic() >= expires:
+                del self.items[key]
+                return
+            self.items.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self.lock:
+            self.items[key] = (value, time.monotonic() + self.ttl)
+            self.items.move_to_end(key)
+            while len(self.items) > self.size:
+                self.items.popitem(last=False)
+
+    def delete(self, key):
+        with self.lock:
+            self.items.pop(key, None)
+
+
+class RedisBackend:
+    """
+    Backend shared by all workers, users are stored as json with ttl. Requires redis package.
+    """
+
+    def __init__(self, url, ttl=60):
+        import redis
+        self.client = redis.Redis.from_url(url)
+        self.ttl = ttl
+
+    def get(self, key):
+        value = self.client.get(f"todos:user:{key}")
+        return json.loads(value) if value is not None else None
+
+    def set(self, key, value):
+        self.client.setex(f"todos:user:{key}", self.ttl, json.dumps(value))
+
+    def delete(self, key):
+        self.client.delete(f"todos:user:{key}")
+
+
+class UserCache:
+    """
+    Loader of logged users for Flask-Login user_loader. User identity is read by primary key
+    and kept in backend until user changes or ttl passes. Redis backend is shared by all workers,
+    so updated and deleted users are seen by every worker at once, in process backend is used without it.
+    Only identity is cached here, roles are read per request.
+    """
+
+    def __init__(self, backend=None):
+        self.backend = backend
+
+    @classmethod
+    def from_config(cls, config):
+        if config.get('USER_CACHE_URL'):
+            return cls(RedisBackend(config['USER_CACHE_URL'], ttl=int(config.get('USER_CACHE_TTL', 60))))
+        size = int(config.get('USER_CACHE_SIZE', 1000))
+        if size <= 0:
+            return cls()
+        return cls(MemoryBackend(size, ttl=int(config.get('USER_CACHE_LOCAL_TTL', 5))))
+
+    def load(self, user_id):
+        data = self.backend.get(user_id) if self.backend else None
+        if data is None:
+            data = self.read(user_id)
+            if data is None:
+                return
+            if self.backend:
+                self.backend.set(user_id, data)
+        return LoggedUser(**data)
+
+    @staticmethod
+    def read(user_id):
+        row = db.session.query(UserTbl.user_id, UserTbl.login, UserTbl.name, UserTbl.email). \
+            filter(UserTbl.user_id == user_id).first()
+        return row._asdict() if row else None
+
+    def forget(self, *user_ids):
+        if self.backend:
+            for user_id in user_ids:
+                self.backend.delete(user_id)
+
+
+def load_user(user_id):
+    """Returns logged user from the user cache of current app"""
+    return current_app.extensions['users'].load(user_id)
+
+
+def forget_users(*user_ids):
+    """Drops users from the user cache of current app, to be called after user changes or is deleted"""
+    current_app.extensions['users'].forget(*user_ids)
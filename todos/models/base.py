@@ -1,5 +1,7 @@
-from sqlalchemy import MetaData, DateTime, Boolean, Integer, SmallInteger
+from uuid import UUID
+from sqlalchemy import MetaData, DateTime, Boolean, Integer, SmallInteger, String, BINARY
 from sqlalchemy.dialects import mysql
+from sqlalchemy.types import TypeDecorator
 from flask_sqlalchemy import SQLAlchemy as _BaseSQLAlchemy
 from flask_migrate import Migrate
 
@@ -25,6 +27,34 @@ UNSIGNEDINT_TYPE = UNSIGNEDINT_TYPE.with_variant(mysql.INTEGER(unsigned=True), '
 # Unsigned integer.
 UNSIGNEDSMALLINT_TYPE = SmallInteger()
 UNSIGNEDSMALLINT_TYPE = UNSIGNEDSMALLINT_TYPE.with_variant(mysql.SMALLINT(unsigned=True), 'mysql')
+# Materialized path, binary collation makes prefix LIKE case sensitive and index range scan possible.
+PATH_TYPE = String(length=1024)
+PATH_TYPE = PATH_TYPE.with_variant(mysql.VARCHAR(length=1024, charset='ascii', collation='ascii_bin'), 'mysql')
+
+
+class BinaryUUID(TypeDecorator):
+    """
+    UUID stored in 16 bytes instead of 36 characters, python values are canonical uuid strings.
+    Values which are not uuids raise ValueError, ids are validated by views before they reach queries.
+    """
+    impl = BINARY(16)
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return
+        if isinstance(value, UUID):
+            return value.bytes
+        try:
+            return UUID(value).bytes
+        except (AttributeError, TypeError):
+            raise ValueError(f"Not valid uuid {value!r}")
+
+    def process_result_value(self, value, dialect):
+        return str(UUID(bytes=bytes(value))) if value is not None else None
+
+
+# Primary and foreign keys.
+UUID_TYPE = BinaryUUID()
 
 
 # The “pre ping” feature will normally emit SQL equivalent to “SELECT 1” each time a connection is checked out
@@ -41,6 +71,40 @@ db = SQLAlchemy(metadata=MetaData(naming_convention=NAMING_CONVENSION))
 migrate = Migrate(db=db)
 
 
+def compile_serializer(columns, exclude=(), names=(), extra=None):
+    """
+    Returns function serializing object or row with columns to dict. Its code is generated once,
+    so a row is serialized by one dict display without loops and getattr calls per column.
+    Enum columns in names are serialized by name, extra maps keys to python expressions of row,
+    keys of columns are replaced in place, other keys are appended.
+    """
+    extra = dict(extra or {})
+    items = list()
+    for column in columns:
+        if column.name in exclude:
+            continue
+        expression = extra.pop(column.name, None) or \
+            (f"row.{column.name}.name" if column.name in names else f"row.{column.name}")
+        items.append(f"{column.name!r}: {expression}")
+    items.extend(f"{key!r}: {expression}" for key, expression in extra.items())
+    namespace = dict()
+    exec(f"def serialize(row):\n    return {{{', '.join(items)}}}\n", namespace)
+    return namespace['serialize']
+
+
 class DictMixin:
+    """
+    Serializes models with columns of their table. Models customize serialization with class attributes:
+    __dict_exclude__ columns, __dict_names__ enum columns serialized by name and __dict_extra__ expressions.
+    """
+    __dict_exclude__ = ()
+    __dict_names__ = ()
+    __dict_extra__ = {}
+
+    @classmethod
+    def compile_serializer(cls):
+        cls.serializer = staticmethod(compile_serializer(cls.__table__.columns, exclude=cls.__dict_exclude__,
+                                                         names=cls.__dict_names__, extra=cls.__dict_extra__))
+
     def to_dict(self):
-        return dict((column.name, getattr(self, column.name)) for column in self.__table__.columns)
+        return self.serializer(self)
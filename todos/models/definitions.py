@@ -1,8 +1,15 @@
-from .base import db, DictMixin, DATETIME_TYPE, BOOLEAN_TYPE, UNSIGNEDSMALLINT_TYPE
-from .utils import on_create, on_drop
-from sqlalchemy_utils import PasswordType, EmailType, force_auto_coercion
+from .base import (db, DictMixin, compile_serializer, DATETIME_TYPE, BOOLEAN_TYPE, UNSIGNEDSMALLINT_TYPE, PATH_TYPE,
+                   UUID_TYPE)
+from .utils import on_create, on_drop, dfs
+from .passwords import AppPasswordType, verify_password
+from operator import attrgetter
+from collections import defaultdict
+from sqlalchemy_utils import EmailType, force_auto_coercion
+from sqlalchemy import and_, exists
+from sqlalchemy.orm import remote, foreign, aliased
 from sqlalchemy.ext.hybrid import hybrid_property
 from enum import Enum
+from uuid import UUID
 from flask_login import UserMixin
 
 force_auto_coercion()
@@ -32,13 +39,14 @@ class UserTbl(db.Model, UserMixin, DictMixin):
     Table with user details.
     """
     __tablename__ = 'User'
+    __dict_exclude__ = ('password',)
 
     __str__ = lambda self: str(self.to_dict()) # noqa
     __repr__ = lambda self: repr(self.to_dict()) # noqa
 
-    user_id = db.Column(db.CHAR(36), primary_key=True)
+    user_id = db.Column(UUID_TYPE, primary_key=True)
     login = db.Column(db.String(length=80), nullable=False, unique=True)
-    password = db.Column(PasswordType(schemes=['pbkdf2_sha512']), nullable=False)
+    password = db.Column(AppPasswordType(schemes=['pbkdf2_sha512']), nullable=False)
     name = db.Column(db.String(length=255), nullable=False)
     email = db.Column(EmailType, nullable=False, unique=True)
     created = db.Column(DATETIME_TYPE, nullable=False)
@@ -63,35 +71,26 @@ class UserTbl(db.Model, UserMixin, DictMixin):
         return self.user_id
 
     def is_authenticated(self, login, password):
-        """Return True if valid credentials provided"""
-        if self.login == login and self.password == password:
+        """Return True if valid credentials provided, password hash is updated if hashing settings changed"""
+        if self.login == login and verify_password(self.password, password):
             return True
         return False
 
     def role(self, todolist_id):
-        role_row = [row.role for row in self.todolists_assoc if row.todolist_id == todolist_id]
-        return role_row[0] if role_row else None
+        return db.session.query(UserTodoListTbl.role). \
+            filter_by(user_id=self.user_id, todolist_id=todolist_id).scalar()
 
     @property
     def owner_todolist_count(self):
-        todolists = [row.todolist_id for row in self.todolists_assoc if row.role == 'owner']
-        return len(todolists)
-
-    def all_todolists(self, label=None, status=None, priority=None):
-        todolists = self.todolists
-        if label:
-            todolists = todolists.filter_by(label=label)
-        if status:
-            todolists = todolists.filter_by(status=getattr(TodoListStatus, status).name)
-        if priority:
-            todolists = todolists.filter_by(priority=getattr(Priority, priority).value)
-        return (row.to_dict() for row in todolists
-                for user_role in row.users_assoc if user_role.user_id == self.user_id)
-
-    def to_dict(self):
-        out = super().to_dict()
-        out.pop('password')
-        return out
+        return db.session.query(db.func.count(UserTodoListTbl.todolist_id)). \
+            filter_by(user_id=self.user_id, role='owner').scalar()
+
+    def all_todolists(self, label=None, status=None, priority=None, history=True, limit=None, after=None):
+        """Returns todolists of user, see read_queries.user_todolists"""
+        # read queries are built on models, they are imported when used
+        from todos.models.api.read_queries import user_todolists
+        return user_todolists(self.user_id, label=label, status=status, priority=priority, history=history,
+                              limit=limit, after=after)
 
 
 class RoleTbl(db.Model, DictMixin):
@@ -123,11 +122,14 @@ class TodoListTbl(db.Model, DictMixin):
     TodoList table includes roots of lists
     """
     __tablename__ = 'TodoList'
+    __dict_names__ = ('status', 'priority')
+    __table_args__ = (db.Index('ix_TodoList_priority_status_label_created_ts_todolist_id',
+                               'priority', 'status', 'label', 'created_ts', 'todolist_id'),)
 
     __str__ = lambda self: str(self.to_dict()) # noqa
     __repr__ = lambda self: repr(self.to_dict()) # noqa
 
-    todolist_id = db.Column(db.CHAR(36), primary_key=True)
+    todolist_id = db.Column(UUID_TYPE, primary_key=True)
     label = db.Column(db.String(length=255), nullable=False)
     description = db.Column(db.String(length=255), nullable=True)
     status = db.Column(db.Enum(TodoListStatus), nullable=False)
@@ -158,18 +160,21 @@ class TodoListTbl(db.Model, DictMixin):
     TaskCount = db.relationship("TaskCountTbl", uselist=False, back_populates="TodoList")
 
     def role(self, user_id):
-        role_row = [row.role for row in self.users_assoc if row.user_id == user_id]
-        return role_row[0] if role_row else None
+        return db.session.query(UserTodoListTbl.role). \
+            filter_by(user_id=user_id, todolist_id=self.todolist_id).scalar()
 
     @property
     def all_roles(self):
-        return [{'login': row.login, 'name': row.name, 'email': row.email, 'role': user_role.role}
-                for row in self.users
-                for user_role in row.todolists_assoc if user_role.todolist_id == self.todolist_id]
+        rows = db.session.query(UserTbl.login, UserTbl.name, UserTbl.email, UserTodoListTbl.role). \
+            join(UserTodoListTbl, UserTodoListTbl.user_id == UserTbl.user_id). \
+            filter(UserTodoListTbl.todolist_id == self.todolist_id). \
+            order_by(UserTbl.name)
+        return [{'login': row.login, 'name': row.name, 'email': row.email, 'role': row.role} for row in rows]
 
     @property
     def children_tasks(self):
-        return (row for row in self.tasks if row.parent_id is None)
+        return db.session.query(TaskTbl).filter_by(todolist_id=self.todolist_id, parent_id=None). \
+            order_by(TaskTbl.priority, TaskTbl.status, TaskTbl.label, TaskTbl.created_ts)
 
     @property
     def creator(self):
@@ -179,26 +184,44 @@ class TodoListTbl(db.Model, DictMixin):
     def status_changes(self):
         return [row.to_dict() for row in self.statuses]
 
-    def to_dict(self):
-        out = super().to_dict()
-        out['status'] = self.status.name
-        out['priority'] = self.priority.name
-        out['status_changes'] = self.status_changes
+    def to_dict(self, history=True):
+        out = self.serializer(self)
+        if history:
+            out['status_changes'] = self.status_changes
+        return out
+
+    @classmethod
+    def to_dicts(cls, todolists, history=True):
+        """Serializes todolists objects or rows, status changes of all todolists are loaded with one query"""
+        serialize = cls.serializer
+        out = [serialize(row) for row in todolists]
+        if history:
+            status_changes = TodoListStatusChangeLogTbl.for_todolists(row['todolist_id'] for row in out)
+            for row in out:
+                row['status_changes'] = status_changes[row['todolist_id']]
         return out
 
 
+# order of todolists, todolist_id makes it unique for keyset pagination
+TODOLIST_ORDER = (TodoListTbl.priority, TodoListTbl.status, TodoListTbl.label, TodoListTbl.created_ts,
+                  TodoListTbl.todolist_id)
+
+
 class TodoListStatusChangeLogTbl(db.Model, DictMixin):
     """
     Table to hold status changes for todolist
     """
     __tablename__ = 'TodoListStatusChangeLog'
+    __dict_exclude__ = ('todolist_id',)
+    __dict_names__ = ('status',)
+    __dict_extra__ = {'changed_by': 'row.User.name'}
 
     __str__ = lambda self: str(self.to_dict()) # noqa
     __repr__ = lambda self: repr(self.to_dict()) # noqa
 
-    todolist_id = db.Column(db.CHAR(36), db.ForeignKey('TodoList.todolist_id', ondelete="cascade"), primary_key=True)
+    todolist_id = db.Column(UUID_TYPE, db.ForeignKey('TodoList.todolist_id', ondelete="cascade"), primary_key=True)
     change_ts = db.Column(DATETIME_TYPE, primary_key=True)
-    changed_by = db.Column(db.CHAR(36), db.ForeignKey('User.user_id', ondelete="cascade"), nullable=False)
+    changed_by = db.Column(UUID_TYPE, db.ForeignKey('User.user_id', ondelete="cascade"), nullable=False)
     status = db.Column(db.Enum(TodoListStatus), nullable=False)
 
     # many to one todolists statuses <=> users
@@ -207,11 +230,21 @@ class TodoListStatusChangeLogTbl(db.Model, DictMixin):
     # many to one todolists statuses <=> todolist
     TodoList = db.relationship("TodoListTbl", back_populates="statuses")
 
-    def to_dict(self):
-        out = super().to_dict()
-        out.pop('todolist_id')
-        out['status'] = self.status.name
-        out['changed_by'] = self.User.name
+    @classmethod
+    def for_todolists(cls, todolist_ids):
+        """Returns status changes with user names grouped by todolist_id, loaded with one query"""
+        out = defaultdict(list)
+        todolist_ids = list(todolist_ids)
+        if not todolist_ids:
+            return out
+
+        rows = db.session.query(cls.todolist_id, cls.change_ts, UserTbl.name, cls.status). \
+            join(UserTbl, UserTbl.user_id == cls.changed_by). \
+            filter(cls.todolist_id.in_(todolist_ids)). \
+            order_by(cls.change_ts.desc())
+        for row in rows:
+            out[row.todolist_id].append({'change_ts': row.change_ts, 'changed_by': row.name,
+                                         'status': row.status.name})
         return out
 
 
@@ -224,8 +257,8 @@ class TodoListCreatorTbl(db.Model, DictMixin):
     __str__ = lambda self: str(self.to_dict()) # noqa
     __repr__ = lambda self: repr(self.to_dict()) # noqa
 
-    todolist_id = db.Column(db.CHAR(36), db.ForeignKey('TodoList.todolist_id', ondelete="cascade"), primary_key=True)
-    created_by = db.Column(db.CHAR(36), db.ForeignKey('User.user_id', ondelete="cascade"), nullable=False)
+    todolist_id = db.Column(UUID_TYPE, db.ForeignKey('TodoList.todolist_id', ondelete="cascade"), primary_key=True)
+    created_by = db.Column(UUID_TYPE, db.ForeignKey('User.user_id', ondelete="cascade"), nullable=False)
 
     # many to one todolists creator <=> users
     User = db.relationship("UserTbl", back_populates="todolistcreator")
@@ -244,36 +277,56 @@ class UserTodoListTbl(db.Model, DictMixin):
     __str__ = lambda self: str(self.to_dict()) # noqa
     __repr__ = lambda self: repr(self.to_dict()) # noqa
 
-    user_id = db.Column(db.CHAR(36), db.ForeignKey('User.user_id', ondelete="cascade"), primary_key=True)
-    todolist_id = db.Column(db.CHAR(36), db.ForeignKey('TodoList.todolist_id', ondelete="cascade"), primary_key=True)
+    user_id = db.Column(UUID_TYPE, db.ForeignKey('User.user_id', ondelete="cascade"), primary_key=True)
+    todolist_id = db.Column(UUID_TYPE, db.ForeignKey('TodoList.todolist_id', ondelete="cascade"), primary_key=True)
     role = db.Column(db.String(length=50), db.ForeignKey('Role.role', ondelete="cascade"), nullable=False)
 
+    # primary key serves lookups by user, this index serves lookups of todolist by role
+    __table_args__ = (db.Index('ix_UserTodoList_todolist_id_role_user_id', 'todolist_id', 'role', 'user_id'),)
+
     User = db.relationship(UserTbl, backref=db.backref("todolists_assoc"))
     TodoList = db.relationship(TodoListTbl, backref=db.backref("users_assoc"))
 
 
+# Materialized path of task is a chain of its ancestors task_ids and its own task_id without dashes,
+# so every segment has fixed width.
+PATH_SEGMENT_LENGTH = 32
+
+
 class TaskTbl(db.Model, DictMixin):
     """
     Table to hold detailed information about tasks.
     """
     __tablename__ = 'Task'
+    __dict_exclude__ = ('path',)
+    __dict_names__ = ('status', 'priority')
+    __dict_extra__ = {'depth': 'row.depth', 'is_leaf': 'row.is_leaf'}
+    __table_args__ = (db.Index('ix_Task_todolist_id_parent_id_order', 'todolist_id', 'parent_id', 'priority',
+                               'status', 'label', 'created_ts'),
+                      # subtrees are ranges of paths inside todolist
+                      db.Index('ix_Task_todolist_id_path', 'todolist_id', 'path'))
 
     __str__ = lambda self: str(self.to_dict()) # noqa
     __repr__ = lambda self: repr(self.to_dict()) # noqa
 
-    task_id = db.Column(db.CHAR(36), primary_key=True)
-    parent_id = db.Column(db.CHAR(36), db.ForeignKey('Task.task_id', ondelete="cascade"), nullable=True)
+    task_id = db.Column(UUID_TYPE, primary_key=True)
+    parent_id = db.Column(UUID_TYPE, db.ForeignKey('Task.task_id', ondelete="cascade"), nullable=True)
     label = db.Column(db.String(length=255), nullable=False, index=True)
     description = db.Column(db.Text(), nullable=True)
-    todolist_id = db.Column(db.CHAR(36), db.ForeignKey('TodoList.todolist_id', ondelete="cascade"), nullable=False,
+    todolist_id = db.Column(UUID_TYPE, db.ForeignKey('TodoList.todolist_id', ondelete="cascade"), nullable=False,
                             index=True)
     status = db.Column(db.Enum(TaskStatus), nullable=False, index=True)
     # inserting values into table to guarantee specific ordering by priority
     priority = db.Column(db.Enum(Priority, values_callable=lambda x: [e.value for e in x]), nullable=False)
     created_ts = db.Column(DATETIME_TYPE, nullable=False)
+    # set by TaskPath trigger
+    path = db.Column(PATH_TYPE, nullable=False, server_default='')
 
     # relation inside table
+    # children are in the same todolist, so they are read by range of ix_Task_todolist_id_parent_id_order
     children_one_level = db.relationship("TaskTbl", backref=db.backref('parent', remote_side=[task_id]),
+                                         primaryjoin=lambda: and_(remote(foreign(TaskTbl.parent_id)) == TaskTbl.task_id,
+                                                                  remote(TaskTbl.todolist_id) == TaskTbl.todolist_id),
                                          order_by=lambda: (TaskTbl.priority, TaskTbl.status, TaskTbl.label,
                                                            TaskTbl.created_ts))
 
@@ -284,9 +337,6 @@ class TaskTbl(db.Model, DictMixin):
     statuses = db.relationship('TaskStatusChangeLogTbl', back_populates='Task',
                                order_by=lambda: (TaskStatusChangeLogTbl.change_ts.desc()))
 
-    # One to one relationship task <--> task depth
-    TaskDepth = db.relationship("TaskDepthTbl", uselist=False, back_populates="Task")
-
     @property
     def children(self):
         return (row.to_dict() for row in self.children_one_level)
@@ -300,54 +350,77 @@ class TaskTbl(db.Model, DictMixin):
 
     @property
     def ancestors(self):
-        task = self
-        while task.parent is not None:
-            task = task.parent
-            yield task.task_id
+        segments = (self.path[x:x + PATH_SEGMENT_LENGTH]
+                    for x in range(len(self.path) - 2 * PATH_SEGMENT_LENGTH, -1, -PATH_SEGMENT_LENGTH))
+        return (str(UUID(segment)) for segment in segments)
 
     @property
     def descendants(self):
-        return (row for row in self.dfs_tree_from_object(visited=list()) if row != self.to_dict())
+        nodes = self.dfs_nodes([self])
+        next(nodes)
+        return (node.to_dict() for node in nodes)
 
     @property
     def dfs_tree(self):
-        visited = list()
-
-        if self.parent is None:
-            for node in self.siblings:
-                visited = node.dfs_tree_from_object(visited)
-        else:
-            visited = self.dfs_tree_from_object(visited)
-        return iter(visited)
-
-    def dfs_tree_from_object(self, visited):
-        current = self
-        visited.append(current.to_dict())
+        roots = self.siblings if self.parent is None else [self]
+        return (node.to_dict() for node in self.dfs_nodes(roots))
 
-        for node in current.children_one_level:
-            if node not in visited:
-                node.dfs_tree_from_object(visited)
-        return visited
+    @staticmethod
+    def dfs_nodes(roots):
+        return dfs(roots, attrgetter('children_one_level'), key=attrgetter('task_id'))
 
-    @property
+    # task without children, they are looked up by range of ix_Task_todolist_id_parent_id_order
+    @hybrid_property
     def is_leaf(self):
-        return False if self.children_one_level else True
+        return not db.session.query(exists().where(TaskTbl.todolist_id == self.todolist_id).
+                                    where(TaskTbl.parent_id == self.task_id)).scalar()
+
+    @is_leaf.expression
+    def is_leaf(cls):
+        child = aliased(cls)
+        return ~exists().where(child.todolist_id == cls.todolist_id).where(child.parent_id == cls.task_id)
 
     @property
     def status_changes(self):
         return [row.to_dict() for row in self.statuses]
 
-    @hybrid_property
+    @property
     def depth(self):
-        return self.TaskDepth.depth
-
-    def to_dict(self):
-        out = super().to_dict()
-        out['status'] = self.status.name
-        out['priority'] = self.priority.name
-        out['depth'] = self.depth
-        out['is_leaf'] = self.is_leaf
-        out['status_changes'] = self.status_changes
+        return len(self.path) // PATH_SEGMENT_LENGTH - 1
+
+    def to_dict(self, history=True, is_leaf=None):
+        """Serializes task, is_leaf is looked up unless caller knows it"""
+        if is_leaf is None:
+            out = self.serializer(self)
+        else:
+            out = self.serializer_without_leaf(self)
+            out['is_leaf'] = is_leaf
+        if history:
+            out['status_changes'] = self.status_changes
+        return out
+
+    @staticmethod
+    def with_children(task_ids):
+        """Returns set of task_ids which have children, loaded with one query"""
+        task_ids = list(task_ids)
+        if not task_ids:
+            return set()
+        return {row.parent_id for row in
+                db.session.query(TaskTbl.parent_id).filter(TaskTbl.parent_id.in_(task_ids)).distinct()}
+
+    @classmethod
+    def to_dicts(cls, tasks, history=True):
+        """Serializes tasks, leaves and status changes of all tasks are loaded with one query each"""
+        tasks = list(tasks)
+        parents = cls.with_children(task.task_id for task in tasks)
+        serialize = cls.serializer_without_leaf
+        out = [serialize(row) for row in tasks]
+        for row in out:
+            row['is_leaf'] = row['task_id'] not in parents
+        if history:
+            status_changes = TaskStatusChangeLogTbl.for_tasks(row['task_id'] for row in out)
+            for row in out:
+                row['status_changes'] = status_changes[row['task_id']]
         return out
 
 
@@ -356,13 +429,16 @@ class TaskStatusChangeLogTbl(db.Model, DictMixin):
     Table to hold status changes for task
     """
     __tablename__ = 'TaskStatusChangeLog'
+    __dict_exclude__ = ('task_id',)
+    __dict_names__ = ('status',)
+    __dict_extra__ = {'changed_by': 'row.User.name'}
 
     __str__ = lambda self: str(self.to_dict()) # noqa
     __repr__ = lambda self: repr(self.to_dict()) # noqa
 
-    task_id = db.Column(db.CHAR(36), db.ForeignKey('Task.task_id', ondelete="cascade"), primary_key=True)
+    task_id = db.Column(UUID_TYPE, db.ForeignKey('Task.task_id', ondelete="cascade"), primary_key=True)
     change_ts = db.Column(DATETIME_TYPE, primary_key=True)
-    changed_by = db.Column(db.CHAR(36), db.ForeignKey('User.user_id', ondelete="cascade"), nullable=False)
+    changed_by = db.Column(UUID_TYPE, db.ForeignKey('User.user_id', ondelete="cascade"), nullable=False)
     status = db.Column(db.Enum(TaskStatus), nullable=False)
 
     # many to one tasks statuses <=> users
@@ -371,11 +447,20 @@ class TaskStatusChangeLogTbl(db.Model, DictMixin):
     # many to one todolists statuses <=> task
     Task = db.relationship("TaskTbl", back_populates="statuses")
 
-    def to_dict(self):
-        out = super().to_dict()
-        out.pop('task_id')
-        out['status'] = self.status.name
-        out['changed_by'] = self.User.name
+    @classmethod
+    def for_tasks(cls, task_ids):
+        """Returns status changes with user names grouped by task_id, loaded with one query"""
+        out = defaultdict(list)
+        task_ids = list(task_ids)
+        if not task_ids:
+            return out
+
+        rows = db.session.query(cls.task_id, cls.change_ts, UserTbl.name, cls.status). \
+            join(UserTbl, UserTbl.user_id == cls.changed_by). \
+            filter(cls.task_id.in_(task_ids)). \
+            order_by(cls.change_ts.desc())
+        for row in rows:
+            out[row.task_id].append({'change_ts': row.change_ts, 'changed_by': row.name, 'status': row.status.name})
         return out
 
 
@@ -388,37 +473,52 @@ class TaskCountTbl(db.Model, DictMixin):
     __str__ = lambda self: str(self.to_dict()) # noqa
     __repr__ = lambda self: repr(self.to_dict()) # noqa
 
-    todolist_id = db.Column(db.CHAR(36), db.ForeignKey('TodoList.todolist_id', ondelete="cascade"), primary_key=True)
+    todolist_id = db.Column(UUID_TYPE, db.ForeignKey('TodoList.todolist_id', ondelete="cascade"), primary_key=True)
     quantity = db.Column(UNSIGNEDSMALLINT_TYPE, nullable=False)
 
     # one to one todolist <=> task count
     TodoList = db.relationship("TodoListTbl", back_populates="TaskCount")
 
 
-class TaskDepthTbl(db.Model, DictMixin):
-    """
-    Table to hold depth of tasks
-    """
-    __tablename__ = 'TaskDepth'
-
-    __str__ = lambda self: str(self.to_dict()) # noqa
-    __repr__ = lambda self: repr(self.to_dict()) # noqa
-
-    task_id = db.Column(db.CHAR(36), db.ForeignKey('Task.task_id', ondelete="cascade"), primary_key=True)
-    depth = db.Column(UNSIGNEDSMALLINT_TYPE, nullable=False)
-
-    # one to one task <=> task depth
-    Task = db.relationship("TaskTbl", back_populates="TaskDepth")
-
-
 task_insert = """
     CREATE TRIGGER TaskInsert AFTER INSERT ON Task
     FOR EACH ROW
     BEGIN
         UPDATE TaskCount SET quantity = quantity + 1 WHERE todolist_id = NEW.todolist_id;
-        INSERT INTO TaskDepth (task_id, depth) VALUES (NEW.task_id,
-            IFNULL((SELECT depth FROM TaskDepth TD WHERE task_id = IFNULL(NEW.parent_id, -1)), -1) + 1);
     END;
 """
 on_create(TaskTbl, task_insert)
 on_drop(TaskTbl, """DROP TRIGGER IF EXISTS TaskInsert;""")
+
+# mysql triggers cannot update Task, but can set path of inserted row,
+# sqlite triggers cannot set NEW values, but can update inserted row
+task_path_mysql = """
+    CREATE TRIGGER TaskPath BEFORE INSERT ON Task
+    FOR EACH ROW
+    BEGIN
+        SET NEW.path = CONCAT(IFNULL((SELECT path FROM Task P WHERE P.task_id = NEW.parent_id), ''),
+                              LOWER(HEX(NEW.task_id)));
+    END;
+"""
+task_path_sqlite = """
+    CREATE TRIGGER TaskPath AFTER INSERT ON Task
+    FOR EACH ROW
+    BEGIN
+        UPDATE Task SET path = IFNULL((SELECT path FROM Task P WHERE P.task_id = NEW.parent_id), '') ||
+                               LOWER(HEX(NEW.task_id))
+        WHERE task_id = NEW.task_id;
+    END;
+"""
+on_create(TaskTbl, task_path_mysql, dialect='mysql')
+on_create(TaskTbl, task_path_sqlite, dialect='sqlite')
+on_drop(TaskTbl, """DROP TRIGGER IF EXISTS TaskPath;""")
+
+
+# serializers of all models are generated once at import
+for model in DictMixin.__subclasses__():
+    model.compile_serializer()
+
+# tasks serialized in bulk take is_leaf from one query for all of them
+TaskTbl.serializer_without_leaf = staticmethod(compile_serializer(
+    TaskTbl.__table__.columns, exclude=TaskTbl.__dict_exclude__, names=TaskTbl.__dict_names__,
+    extra={'depth': TaskTbl.__dict_extra__['depth']}))
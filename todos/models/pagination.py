@@ -0,0 +1,130 @@
+import json
+from base64 import urlsafe_b64encode, urlsafe_b64decode
+from binascii import Error as DecodeError
+from datetime import datetime
+from enum import Enum
+from sqlalchemy import DateTime, Enum as EnumType, String, and_, or_
+from todos.models.base import BinaryUUID
+from tools import uuid_param
+
+
+class InvalidCursorError(Exception):
+    """Raised when cursor cannot be decoded"""
+    pass
+
+
+class Page(list):
+    """
+    Rows of one page, cursor points after the last row or is None if there are no more rows.
+    """
+
+    def __init__(self, rows, cursor=None):
+        super().__init__(rows)
+        self.cursor = cursor
+
+
+def sort_key(row, columns):
+    """
+    Returns values of columns of row as compared by database. Enums are stored by value if it is a string
+    or by name otherwise and their declaration order is the same as alphabetical order of stored values.
+    """
+    return tuple((value.value if isinstance(value.value, str) else value.name) if isinstance(value, Enum) else value
+                 for value in (getattr(row, column.name) for column in columns))
+
+
+def dump_key(row, columns):
+    return [value.isoformat() if isinstance(value, datetime) else value for value in sort_key(row, columns)]
+
+
+def load_value(value, column):
+    """Returns value of column from cursor as in sort_key, raises ValueError or TypeError if it is not valid"""
+    column_type = column.type
+    if isinstance(column_type, BinaryUUID):
+        if not isinstance(value, str):
+            raise TypeError(f"Not valid uuid {value!r}")
+        return uuid_param(value)
+    if isinstance(column_type, EnumType):
+        if value not in column_type.enums:
+            raise ValueError(f"Not valid {column.name} {value!r}")
+        return value
+    if isinstance(getattr(column_type, 'impl', column_type), DateTime):
+        # timestamps are stored without time zone
+        value = datetime.fromisoformat(value)
+        if value.tzinfo is not None:
+            raise ValueError(f"Not valid {column.name} {value!r}")
+        return value
+    if isinstance(column_type, String) and not isinstance(value, str):
+        raise TypeError(f"Not valid {column.name} {value!r}")
+    return value
+
+
+def load_key(key, columns):
+    """Returns sort key from decoded cursor, every value is validated, so cursor never reaches queries unchecked"""
+    if not isinstance(key, list) or len(key) != len(columns):
+        raise InvalidCursorError
+    try:
+        return tuple(load_value(value, column) for column, value in zip(columns, key))
+    except (ValueError, TypeError):
+        raise InvalidCursorError
+
+
+def encode(value):
+    return urlsafe_b64encode(json.dumps(value).encode('utf8')).decode('ascii')
+
+
+def decode(cursor):
+    return json.loads(urlsafe_b64decode(cursor.encode('ascii')))
+
+
+def encode_cursor(row, columns):
+    """Returns opaque cursor pointing after row in order of columns"""
+    return encode(dump_key(row, columns))
+
+
+def decode_cursor(cursor, columns):
+    """Returns sort key from cursor, raises InvalidCursorError if cursor is not valid for columns"""
+    try:
+        return load_key(decode(cursor), columns)
+    except (UnicodeError, DecodeError, ValueError, TypeError):
+        raise InvalidCursorError
+
+
+def encode_tree_cursor(rows, columns):
+    """
+    Returns opaque cursor pointing after the last row in depth first order of tree, rows are the chain
+    of its ancestors ended with the row. Order of siblings is given by columns.
+    """
+    return encode([dump_key(row, columns) for row in rows])
+
+
+def decode_tree_cursor(cursor, columns):
+    """Returns sort keys of chain of rows from cursor, raises InvalidCursorError if cursor is not valid for columns"""
+    try:
+        keys = decode(cursor)
+        if not isinstance(keys, list) or not keys:
+            raise InvalidCursorError
+        return [load_key(key, columns) for key in keys]
+    except (UnicodeError, DecodeError, ValueError, TypeError):
+        raise InvalidCursorError
+
+
+def after(columns, key, inclusive=False):
+    """
+    Returns condition for rows following key in order of columns, with inclusive the row with key too.
+    Row value comparison is expanded to (a > x) OR (a = x AND b > y) OR ..., so it can be served
+    by range scan of index on columns.
+    """
+    conditions = [and_(*(column == value for column, value in zip(columns[:x], key[:x])), columns[x] > key[x])
+                  for x in range(len(columns))]
+    if inclusive:
+        conditions.append(and_(*(column == value for column, value in zip(columns, key))))
+    return or_(*conditions)
+
+
+def paginate(rows, limit, columns):
+    """Returns Page of the first limit rows, rows may contain one more row to tell if the next page exists"""
+    rows = list(rows)
+    if limit is None or len(rows) <= limit:
+        return Page(rows)
+    rows = rows[:limit]
+    return Page(rows, encode_cursor(rows[-1], columns))
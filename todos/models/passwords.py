@@ -0,0 +1,55 @@
+from flask import current_app, has_app_context
+from passlib.context import CryptContext
+from sqlalchemy_utils import PasswordType
+
+
+def password_settings(config):
+    """
+    Returns CryptContext settings from app config. The first scheme is used for new hashes,
+    hashes of other schemes or with other rounds are updated on login.
+    """
+    schemes = [scheme.strip() for scheme in config.get('PASSWORD_SCHEMES', 'pbkdf2_sha512').split(',')]
+    settings = dict(schemes=schemes, default=schemes[0], deprecated=schemes[1:])
+    if config.get('PASSWORD_ROUNDS'):
+        rounds = int(config['PASSWORD_ROUNDS'])
+        for setting in ('default_rounds', 'min_rounds', 'max_rounds'):
+            settings[f"{schemes[0]}__{setting}"] = rounds
+    return settings
+
+
+def password_context(config):
+    """Returns CryptContext configured by PASSWORD_SCHEMES and PASSWORD_ROUNDS of app config"""
+    return CryptContext(**password_settings(config))
+
+
+class AppPasswordType(PasswordType):
+    """
+    PasswordType hashing and verifying with CryptContext of current app, so each app uses its own
+    hashing settings. Context given by keyword arguments is used outside of app context.
+    """
+
+    @property
+    def context(self):
+        if has_app_context() and 'passwords' in current_app.extensions:
+            return current_app.extensions['passwords']
+        return self.default_context
+
+    @context.setter
+    def context(self, value):
+        self.default_context = value
+
+
+def verify_password(password, secret):
+    """
+    Returns True if secret matches Password column value, it is verified with hashing settings of current app
+    and the hash is replaced in place if it was created with other hashing settings.
+    """
+    if password is None or secret is None:
+        return False
+
+    context = current_app.extensions.get('passwords', password.context) if has_app_context() else password.context
+    valid, new_hash = context.verify_and_update(secret, password.hash)
+    if valid and new_hash:
+        password.hash = new_hash.encode('utf8')
+        password.changed()
+    return valid
@@ -1,12 +1,16 @@
+import os
+import time
+from threading import Lock
+from uuid import UUID
 from sqlalchemy import Table
 from sqlalchemy import DDL
 from sqlalchemy.event import listen
 from functools import partial
 
 
-def on_create(class_name, sqltext):
+def on_create(class_name, sqltext, dialect=None):
 
-    ddl = DDL(sqltext)
+    ddl = DDL(sqltext).execute_if(dialect=dialect)
 
     def listener(tablename, ddl, table, bind, **kw):
         if table.name == tablename:
@@ -17,9 +21,9 @@ def on_create(class_name, sqltext):
            partial(listener, class_name.__table__.name, ddl))
 
 
-def on_drop(class_name, sqltext):
+def on_drop(class_name, sqltext, dialect=None):
 
-    ddl = DDL(sqltext)
+    ddl = DDL(sqltext).execute_if(dialect=dialect)
 
     def listener(tablename, ddl, table, bind, **kw):
         if table.name == tablename:
@@ -28,3 +32,54 @@ def on_drop(class_name, sqltext):
     listen(Table,
            'before_drop',
            partial(listener, class_name.__table__.name, ddl))
+
+
+def dfs(roots, children, key):
+    """
+    Iterative depth first traversal which yields nodes lazily in preorder.
+    Nodes are visited once by key, explicit stack is used instead of recursion,
+    so the traversal is linear and deep trees cannot exceed recursion limit.
+    """
+    visited = set()
+    stack = list(reversed(list(roots)))
+    while stack:
+        node = stack.pop()
+        node_key = key(node)
+        if node_key in visited:
+            continue
+        visited.add(node_key)
+        yield node
+        stack.extend(reversed(list(children(node))))
+
+
+class TimeOrderedIds:
+    """
+    Generator of version 7 uuids: 48 bits of unix time in milliseconds, 12 bits of counter and 62 random bits.
+    Ids of one process are strictly increasing, so rows are appended at the end of clustered index instead
+    of splitting random pages. Counter starts at random value every millisecond and borrows the next
+    millisecond when it overflows, clock going back keeps the last used millisecond.
+    """
+
+    def __init__(self):
+        self.lock = Lock()
+        self.last_ms = 0
+        self.counter = 0
+
+    def __call__(self):
+        with self.lock:
+            now_ms = time.time_ns() // 1000000
+            if now_ms > self.last_ms:
+                self.last_ms = now_ms
+                self.counter = int.from_bytes(os.urandom(2), 'big') & 0x7ff
+            else:
+                self.counter += 1
+                if self.counter > 0xfff:
+                    self.last_ms += 1
+                    self.counter = 0
+            value = (self.last_ms & 0xffffffffffff) << 80 | 0x7 << 76 | self.counter << 64 | 0x2 << 62 | \
+                int.from_bytes(os.urandom(8), 'big') & 0x3fffffffffffffff
+        return str(UUID(int=value))
+
+
+# new primary keys
+uuid7 = TimeOrderedIds()
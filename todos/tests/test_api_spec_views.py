@@ -0,0 +1,48 @@
+import json
+import os
+import sys
+import tempfile
+from unittest import mock
+from tests.base import IntegrationTestCase
+from todos.views.api_spec import ApiSpec
+
+# module is shadowed by its blueprint in todos.views
+api_spec = sys.modules[ApiSpec.__module__]
+
+
+class ApiSpecTests(IntegrationTestCase):
+
+    def test_get(self):
+        with mock.patch.object(api_spec, 'build_spec', wraps=api_spec.build_spec) as build_spec:
+            result = self.client.get('/api/v1/')
+            self.assertEqual(result.status_code, 200)
+            self.assertEqual(result.mimetype, 'application/json')
+            self.assertIn('/api/v1/tasks/{todolist_id}', result.json['paths'])
+            etag = result.headers['ETag']
+            self.assertFalse(etag.startswith('W/'))
+            self.assertIn('max-age=3600', result.headers['Cache-Control'])
+
+            # the same bytes are served again, document is built once
+            again = self.client.get('/api/v1/')
+            self.assertEqual(again.data, result.data)
+            self.assertEqual(again.headers['ETag'], etag)
+            self.assertEqual(build_spec.call_count, 1)
+
+            # not modified for the current etag
+            result = self.client.get('/api/v1/', headers={'If-None-Match': etag})
+            self.assertEqual(result.status_code, 304)
+            self.assertEqual(result.data, b'')
+            result = self.client.get('/api/v1/', headers={'If-None-Match': '"other"'})
+            self.assertEqual(result.status_code, 200)
+
+    def test_dump_spec(self):
+        from scripts.manage import main
+        with tempfile.TemporaryDirectory() as directory:
+            output = os.path.join(directory, 'api_spec.json')
+            result = self.app.test_cli_runner().invoke(main, ['dump-spec', '--output', output])
+            self.assertEqual(result.exit_code, 0, repr(result.exception))
+            with open(output, 'rb') as f:
+                content = f.read()
+        # the same document as served by api
+        self.assertEqual(content, self.client.get('/api/v1/').data)
+        self.assertIn('paths', json.loads(content))
@@ -0,0 +1,59 @@
+import json
+from datetime import date, datetime, timedelta, timezone
+from uuid import uuid4
+from flask import jsonify
+from flask.json import JSONEncoder as FlaskJSONEncoder
+from tests.base import TestCaseWithDB
+from todos.encoders import json_encoder, http_date, JSONEncoder, ORJSONEncoder
+from todos.models.definitions import Priority, TaskStatus
+
+
+class EncoderTests(TestCaseWithDB):
+
+    def setUp(self):
+        super().setUp()
+        self.data = [{'task_id': str(uuid4()), 'label': 'Zadanie ąę', 'priority': 'high', 'depth': 2,
+                      'is_leaf': True, 'description': None, 'created_ts': datetime(2026, 10, 18, 12, 30, 15),
+                      'status_changes': [{'status': 'active', 'change_ts': datetime(2026, 10, 18, 12, 30, 15)}]}]
+
+    def encode(self, encoder, data, **kwargs):
+        return json.dumps(data, cls=encoder, sort_keys=True, **kwargs)
+
+    def test_encoders(self):
+        expected = json.loads(self.encode(FlaskJSONEncoder, self.data))
+        self.assertEqual(expected[0]['created_ts'], 'Sun, 18 Oct 2026 12:30:15 GMT')
+
+        for encoder in (json_encoder({'JSON_ENCODER': 'json'}), json_encoder({'JSON_ENCODER': 'orjson'})):
+            # the same values as Flask encoder, compact even if indentation is requested
+            output = self.encode(encoder, self.data, indent=2)
+            self.assertEqual(json.loads(output), expected)
+            self.assertNotIn('\n', output)
+            self.assertNotIn('", "', output)
+            with self.assertRaises(TypeError):
+                self.encode(encoder, {'a': object()})
+
+        # enums by name, keys sorted, orjson gets enums already serialized by name
+        encoder = json_encoder({'JSON_ENCODER': 'json'})
+        self.assertEqual(self.encode(encoder, {'b': Priority.high, 'a': TaskStatus.done}), '{"a":"done","b":"high"}')
+
+        self.assertTrue(issubclass(json_encoder({'JSON_ENCODER': 'auto'}), ORJSONEncoder))
+        self.assertTrue(issubclass(json_encoder({}), ORJSONEncoder))
+        self.assertTrue(issubclass(json_encoder({'JSON_ENCODER': 'json'}), JSONEncoder))
+
+        # pretty printing is used only when configured
+        for name in ('json', 'orjson'):
+            encoder = json_encoder({'JSON_ENCODER': name, 'JSONIFY_PRETTYPRINT_REGULAR': 'true'})
+            self.assertEqual(self.encode(encoder, {'a': 1}, indent=2), '{\n  "a": 1\n}')
+
+    def test_http_date(self):
+        for value in (datetime(2026, 10, 18, 12, 30, 15), datetime(1999, 1, 1, 0, 0, 59, 999999),
+                      datetime(2026, 2, 28, 23, 5, tzinfo=timezone(timedelta(hours=-2))), date(2026, 10, 18)):
+            self.assertEqual(http_date(value), json.loads(self.encode(FlaskJSONEncoder, value)))
+
+    def test_jsonify(self):
+        # app is in debug mode, but responses are compact
+        response = jsonify(self.data)
+        self.assertEqual(response.mimetype, 'application/json')
+        self.assertNotIn(b'\n  ', response.data)
+        self.assertEqual(response.json[0]['created_ts'], 'Sun, 18 Oct 2026 12:30:15 GMT')
+        self.assertEqual(response.json[0]['label'], 'Zadanie ąę')
@@ -1,10 +1,15 @@
-from uuid import uuid4
+from uuid import uuid4, UUID
 from datetime import datetime
-from tests.base import TestCaseWithDB
+from sqlalchemy import event
+from sqlalchemy.exc import StatementError
+from tests.base import TestCaseWithDB, count_statements
 from todos.models.definitions import (db, UserTbl, RoleTbl, Priority, TodoListStatus,
-                                      TaskTbl, TaskStatus)
+                                      TaskTbl, TaskStatus, PATH_SEGMENT_LENGTH)
 from todos.models.api.todolists_api import TodoListApi
 from todos.models.api.tasks_api import TaskApi
+from todos.models.api.task_tree import TaskTree, TASK_ORDER
+from todos.models.pagination import sort_key
+from todos.models.api.roles import reload_roles
 
 
 class TaskApiTests(TestCaseWithDB):
@@ -149,6 +154,75 @@ class TaskApiTests(TestCaseWithDB):
             ]
         )
 
+    def test_get_tasks_round_trips(self):
+        self.create_tasks_set()
+
+        task0 = db.session.query(TaskTbl).filter_by(label='Task 0').first()
+
+        # the same output as objects serialized one by one
+        self.assertEqual(self.task_api.get_tasks(expand=True), list(task0.dfs_tree))
+        self.assertEqual(self.task_api.get_tasks(expand=True, task_id=task0.task_id), list(task0.descendants))
+
+        task_api = TaskApi(self.user.user_id, self.todolist.todolist_id)
+        with count_statements() as statements:
+            # tree and status changes
+            task_api.get_tasks(expand=True)
+            small_tree = len(statements)
+
+            # subtree is loaded as a range of paths of task read by primary key
+            del statements[:]
+            task_api.get_tasks(expand=True, task_id=task0.task_id)
+            self.assertEqual(len(statements), 3)
+
+            # children are read without tree, leaves among them with another query
+            del statements[:]
+            task_api.get_tasks(expand=False, history=False)
+            self.assertEqual(len(statements), 2)
+
+            for x in range(20):
+                self.task_api.create_task({'label': f"Task 1{x}", 'status': 'active', 'priority': Priority.low.value,
+                                           'parent_id': task0.task_id})
+            db.session.expire_all()
+
+            task_api = TaskApi(self.user.user_id, self.todolist.todolist_id)
+            del statements[:]
+            self.assertEqual(len(task_api.get_tasks(expand=True)), 30)
+            self.assertEqual(len(statements), small_tree)
+            self.assertEqual(small_tree, 2)
+
+            # children reads don't grow with todolist
+            task0_id = task0.task_id
+            del statements[:]
+            self.assertEqual(len(task_api.get_tasks(expand=False, task_id=task0_id, history=False)), 22)
+            self.assertEqual(len(statements), 3)
+
+    def test_status_changes_bulk(self):
+        self.create_tasks_set()
+
+        task1 = db.session.query(TaskTbl).filter_by(label='Task 1').first()
+        self.task_api.update_task(task1.task_id, {'status': 'ready'})
+        db.session.expire_all()
+
+        tasks = db.session.query(TaskTbl).filter_by(todolist_id=self.todolist.todolist_id).all()
+        self.assertEqual(TaskTbl.to_dicts(tasks), [row.to_dict() for row in tasks])
+        self.assertEqual([(row['changed_by'], row['status']) for row in task1.to_dict()['status_changes']],
+                         [('Test User 1', 'ready'), ('Test User 1', 'active')])
+
+        # one query for leaves and one for status changes of all tasks
+        db.session.expire_all()
+        tasks = db.session.query(TaskTbl).filter_by(todolist_id=self.todolist.todolist_id).all()
+        for task in tasks:
+            task.to_dict(history=False)
+
+        with count_statements() as statements:
+            TaskTbl.to_dicts(tasks)
+            self.assertEqual(len(statements), 2)
+
+        # history can be skipped
+        self.assertEqual([row for row in TaskTbl.to_dicts(tasks, history=False) if 'status_changes' in row], [])
+        self.assertEqual([row for row in self.task_api.get_tasks(expand=True, history=False)
+                          if 'status_changes' in row], [])
+
     def test_update_task(self):
         self.create_tasks_set()
 
@@ -222,6 +296,13 @@ class TaskApiTests(TestCaseWithDB):
             ]
         )
 
+        # task count drops by the whole subtree, task of other todolist is not deleted
+        self.assertEqual(self.todolist.TaskCount.quantity, 4)
+        self.assertEqual(self.task_api.delete_task(task.task_id), None)
+        self.assertEqual(TaskApi(self.user.user_id, str(uuid4())).delete_task(
+            db.session.query(TaskTbl.task_id).filter_by(label='Task 0').scalar()), None)
+        self.assertEqual(self.todolist.TaskCount.quantity, 4)
+
     def test_purge(self):
         self.create_tasks_set()
 
@@ -245,7 +326,9 @@ class TaskApiTests(TestCaseWithDB):
             ]
         )
 
-        self.assertEqual(self.task_api.purge_tasks(), True)
+        # Task 2, Task 7, Task 3, Task 8
+        self.assertEqual(self.task_api.purge_tasks(), 4)
+        self.assertEqual(self.todolist.TaskCount.quantity, 6)
 
         # tree after purging
         self.assertEqual(
@@ -268,21 +351,25 @@ class TaskApiTests(TestCaseWithDB):
         task1 = db.session.query(TaskTbl).filter_by(label='Task 1').first()
         task2 = db.session.query(TaskTbl).filter_by(label='Task 2').first()
 
-        self.assertEqual(self.task_api._it_is_possible_to_reparent(task1.task_id, task1.task_id),
+        def possible(task_id, new_parent_id):
+            return TaskApi._possible_reparent(self.task_api.read_task_row(task_id), new_parent_id,
+                                              self.task_api.read_task_row(new_parent_id))
+
+        self.assertEqual(possible(task1.task_id, task1.task_id),
                          False, 'task itself cannot be parent')
-        self.assertEqual(self.task_api._it_is_possible_to_reparent('123', task1.task_id),
+        self.assertEqual(possible(str(uuid4()), task1.task_id),
                          False, 'task not exists')
-        self.assertEqual(self.task_api._it_is_possible_to_reparent(None, task1.task_id),
+        self.assertEqual(possible(None, task1.task_id),
                          False, 'task cannot be none')
-        self.assertEqual(self.task_api._it_is_possible_to_reparent(task1.task_id, '123'),
+        self.assertEqual(possible(task1.task_id, str(uuid4())),
                          False, 'parent not exists')
-        self.assertEqual(self.task_api._it_is_possible_to_reparent(task0.task_id, None),
+        self.assertEqual(possible(task0.task_id, None),
                          False, 'the same parent none')
-        self.assertEqual(self.task_api._it_is_possible_to_reparent(task1.task_id, None),
+        self.assertEqual(possible(task1.task_id, None),
                          True, 'different parent none - ok')
-        self.assertEqual(self.task_api._it_is_possible_to_reparent(task1.task_id, task2.task_id),
+        self.assertEqual(possible(task1.task_id, task2.task_id),
                          True, 'different parent not none - ok')
-        self.assertEqual(self.task_api._it_is_possible_to_reparent(task0.task_id, task1.task_id),
+        self.assertEqual(possible(task0.task_id, task1.task_id),
                          False, 'task cannot be moved to its descendant')
 
     def test_reparent(self):
@@ -333,6 +420,7 @@ class TaskApiTests(TestCaseWithDB):
         # nothing changed, good parent but depth limit exceeded
         db.session.query(RoleTbl).filter_by(role='owner').update({'task_depth_limit': 3})
         db.session.commit()
+        reload_roles()
         self.assertEqual(self.task_api.reparent_tasks(task1.task_id, task7.task_id), False)
 
         # nothing changed, good parent but depth limit exeeded
@@ -356,6 +444,7 @@ class TaskApiTests(TestCaseWithDB):
         # changed
         db.session.query(RoleTbl).filter_by(role='owner').update({'task_depth_limit': 10})
         db.session.commit()
+        reload_roles()
         self.assertEqual(self.task_api.reparent_tasks(task1.task_id, task7.task_id), True)
 
         # changed
@@ -375,3 +464,243 @@ class TaskApiTests(TestCaseWithDB):
                 {'label': 'Task 6', 'priority': 'high', 'status': 'active', 'depth': 1, 'is_leaf': True}
             ]
         )
+
+    def test_path(self):
+        self.create_tasks_set()
+
+        def task(label):
+            return db.session.query(TaskTbl).filter_by(label=label).first()
+
+        def labels(path):
+            return [db.session.query(TaskTbl.label).filter(TaskTbl.path == path[:x + PATH_SEGMENT_LENGTH]).scalar()
+                    for x in range(0, len(path), PATH_SEGMENT_LENGTH)]
+
+        # path is a chain of ancestors ended with task itself
+        self.assertEqual(labels(task('Task 9').path), ['Task 0', 'Task 1', 'Task 4', 'Task 9'])
+        self.assertEqual(task('Task 9').depth, 3)
+        self.assertEqual(list(task('Task 9').ancestors),
+                         [task('Task 4').task_id, task('Task 1').task_id, task('Task 0').task_id])
+
+        # paths of the whole subtree are rewritten after reparent
+        task1, task7 = task('Task 1'), task('Task 7')
+        self.assertEqual(self.task_api.reparent_tasks(task1.task_id, task7.task_id), True)
+        db.session.expire_all()
+        self.assertEqual(labels(task('Task 9').path), ['Task 2', 'Task 7', 'Task 1', 'Task 4', 'Task 9'])
+        self.assertEqual(task('Task 9').depth, 4)
+        self.assertTrue(task('Task 1').path.startswith(task('Task 2').path))
+        self.assertFalse(task('Task 2').path.startswith(task('Task 1').path))
+
+        # subtree is a range of paths
+        subtree = db.session.query(TaskTbl.label).filter(TaskTbl.path.like(f"{task('Task 1').path}%"))
+        self.assertEqual(sorted(row.label for row in subtree),
+                         ['Task 1', 'Task 3', 'Task 4', 'Task 5', 'Task 8', 'Task 9'])
+
+        # api doesn't expose path
+        self.assertNotIn('path', task('Task 1').to_dict())
+
+        # keys are stored in 16 bytes, path segments are their hex
+        stored = db.session.execute('SELECT length(task_id), lower(hex(task_id)) FROM Task WHERE label = :label',
+                                    {'label': 'Task 9'}).first()
+        self.assertEqual(stored[0], 16)
+        self.assertEqual(stored[1], task('Task 9').path[-PATH_SEGMENT_LENGTH:])
+        self.assertEqual(task('Task 9').to_dict()['task_id'], str(UUID(stored[1])))
+
+        # not valid key is not bound
+        with self.assertRaises(StatementError) as error:
+            db.session.query(TaskTbl).filter_by(task_id='not a uuid').first()
+        self.assertIsInstance(error.exception.orig, ValueError)
+        db.session.rollback()
+
+    def test_task_tree(self):
+        self.create_tasks_set()
+        tree = TaskTree.load(self.todolist.todolist_id)
+
+        def task(label):
+            return db.session.query(TaskTbl).filter_by(label=label).first()
+
+        def labels(nodes):
+            return [node.row.label for node in nodes]
+
+        # the same answers as relationships of task objects
+        task1 = task('Task 1')
+        self.assertEqual(labels(tree.children_of(task1.task_id)), [row.label for row in task1.children_one_level])
+        self.assertEqual(labels(tree.children_of()), [row.label for row in self.todolist.children_tasks])
+        self.assertEqual(tree.to_dicts(tree.descendants(task1.task_id)), list(task1.descendants))
+        self.assertEqual(tree.to_dicts(tree.descendants()), list(task('Task 0').dfs_tree))
+        self.assertEqual(tree.depth(task('Task 9').task_id), 3)
+        self.assertTrue(tree.is_leaf(task('Task 9').task_id))
+        self.assertFalse(tree.is_leaf(task1.task_id))
+
+        # unknown task has no children
+        self.assertEqual(tree.children_of(str(uuid4())), [])
+        self.assertNotIn(str(uuid4()), tree.nodes)
+
+        # page loads only tasks which can get to it, pages of every size follow the whole tree
+        page_tree, page = TaskTree.load_page(self.todolist.todolist_id, None, [], 2)
+        self.assertEqual(labels(page), ['Task 2', 'Task 7', 'Task 0'])
+        self.assertEqual(len(page_tree.nodes), 5)
+        for limit in range(1, 11):
+            nodes, keys = list(), []
+            while True:
+                page_tree, page = TaskTree.load_page(self.todolist.todolist_id, task1.task_id, keys, limit)
+                nodes.extend(page[:limit])
+                if len(page) <= limit:
+                    break
+                chain = page_tree.chain(page[limit - 1].task_id, task1.task_id)
+                keys = [sort_key(node.row, TASK_ORDER) for node in chain]
+            self.assertEqual(labels(nodes), labels(tree.descendants(task1.task_id)))
+
+    def test_serializers(self):
+        self.create_tasks_set()
+        task = db.session.query(TaskTbl).filter_by(label='Task 1').first()
+
+        # the same shapes as serialization column by column
+        expected = {column.name: getattr(task, column.name) for column in TaskTbl.__table__.columns}
+        expected.pop('path')
+        expected.update(status=task.status.name, priority=task.priority.name, depth=1, is_leaf=False)
+        self.assertEqual(list(task.to_dict(history=False).items()), list(expected.items()))
+        expected['status_changes'] = [{'change_ts': change.change_ts, 'changed_by': 'Test User 1',
+                                       'status': change.status.name} for change in task.statuses]
+        self.assertEqual(task.to_dict(), expected)
+        self.assertEqual(TaskTbl.to_dicts([task]), [expected])
+        self.assertEqual(list(task.statuses[0].to_dict()), ['change_ts', 'changed_by', 'status'])
+
+        # task tree serializes rows in the same shape
+        tree = TaskTree.load(self.todolist.todolist_id)
+        self.assertEqual(list(tree.to_dict(tree[task.task_id]).items()), list(task.to_dict(history=False).items()))
+
+        # password is not serialized, other models serialize all columns
+        self.assertNotIn('password', self.user.to_dict())
+        self.assertEqual(list(self.user.to_dict()), ['user_id', 'login', 'name', 'email', 'created'])
+        role = db.session.query(RoleTbl).filter_by(role='owner').one()
+        self.assertEqual(role.to_dict(), {column.name: getattr(role, column.name)
+                                          for column in RoleTbl.__table__.columns})
+
+    def test_order_index(self):
+        self.create_tasks_set()
+        task1 = db.session.query(TaskTbl).filter_by(label='Task 1').first()
+
+        def plan(query):
+            statement = query.statement.compile(db.engine)
+            params = [statement.params[name] for name in statement.positiontup]
+            rows = db.session.connection().execute(f"EXPLAIN QUERY PLAN {statement}", params)
+            return ' '.join(row[-1] for row in rows)
+
+        children = db.session.query(TaskTbl). \
+            filter(TaskTbl.parent_id == task1.task_id, TaskTbl.todolist_id == task1.todolist_id). \
+            order_by(TaskTbl.priority, TaskTbl.status, TaskTbl.label, TaskTbl.created_ts)
+        tree = db.session.query(TaskTbl.task_id).filter(TaskTbl.todolist_id == task1.todolist_id). \
+            order_by(TaskTbl.parent_id, TaskTbl.priority, TaskTbl.status, TaskTbl.label, TaskTbl.created_ts)
+
+        # children, roots and the whole tree are read in index order without sorting
+        for query in (children, self.todolist.children_tasks, tree):
+            self.assertIn('ix_Task_todolist_id_parent_id_order', plan(query))
+            self.assertNotIn('TEMP B-TREE', plan(query))
+
+        # relationship reads children by the same index range
+        self.assertEqual([row.label for row in task1.children_one_level], [row.label for row in children])
+        self.assertEqual(list(children), list(task1.children_one_level))
+
+    def test_is_leaf(self):
+        self.create_tasks_set()
+
+        def leaves():
+            db.session.expire_all()
+            return sorted(row.label for row in db.session.query(TaskTbl) if row.is_leaf)
+
+        self.assertEqual(leaves(), ['Task 5', 'Task 6', 'Task 7', 'Task 8', 'Task 9'])
+
+        # leaves filtered in sql
+        self.assertEqual(sorted(row.label for row in db.session.query(TaskTbl).filter(TaskTbl.is_leaf)), leaves())
+
+        # reparent makes old parent leaf and new parent not
+        task1 = db.session.query(TaskTbl).filter_by(label='Task 1').first()
+        task6 = db.session.query(TaskTbl).filter_by(label='Task 6').first()
+        task7 = db.session.query(TaskTbl).filter_by(label='Task 7').first()
+        self.assertEqual(self.task_api.reparent_tasks(task6.task_id, task7.task_id), True)
+        self.assertEqual(leaves(), ['Task 5', 'Task 6', 'Task 8', 'Task 9'])
+
+        # delete of the last child makes parent leaf
+        self.assertEqual(self.task_api.delete_task(task6.task_id), True)
+        self.assertEqual(leaves(), ['Task 5', 'Task 7', 'Task 8', 'Task 9'])
+
+        # serialized objects and tree rows agree
+        task1 = db.session.query(TaskTbl).filter_by(task_id=task1.task_id).first()
+        self.assertEqual(task1.to_dict(history=False)['is_leaf'],
+                         TaskTree.load(self.todolist.todolist_id).is_leaf(task1.task_id))
+
+    def test_purge_todolist_scope(self):
+        self.create_tasks_set()
+
+        # done task in another todolist is not purged
+        todolist_api = TodoListApi(self.user.user_id)
+        todolist = todolist_api.create_todolist({'label': 'List 2', 'status': TodoListStatus.active.name,
+                                                 'priority': Priority.high.value})
+        task_api = TaskApi(self.user.user_id, todolist.todolist_id)
+        task_api.create_task({'label': 'Task 10', 'status': 'done', 'priority': Priority.high.value})
+
+        selects = list()
+
+        def collect(conn, cursor, statement, parameters, context, executemany):
+            if statement.startswith('SELECT'):
+                selects.append((statement, parameters))
+
+        event.listen(db.engine, 'before_cursor_execute', collect)
+        try:
+            self.assertEqual(self.task_api.purge_tasks(), 4)
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', collect)
+        self.assertEqual(db.session.query(TaskTbl).filter_by(label='Task 10').count(), 1)
+
+        # descendants of each done task are read by range of ix_Task_todolist_id_path
+        statement, parameters = selects[0]
+        rows = db.session.connection().connection.cursor().execute(f"EXPLAIN QUERY PLAN {statement}", parameters)
+        self.assertIn('USING INDEX ix_Task_todolist_id_path (todolist_id=? AND path>? AND path<?)',
+                      ' '.join(row[-1] for row in rows))
+
+        # nothing left to purge
+        self.assertEqual(self.task_api.purge_tasks(), 0)
+        self.assertEqual(self.todolist.TaskCount.quantity, 6)
+        self.assertEqual(task_api.purge_tasks(), 1)
+        self.assertEqual(todolist.TaskCount.quantity, 0)
+
+    def test_reparent_round_trips(self):
+        self.create_tasks_set()
+
+        task1 = db.session.query(TaskTbl).filter_by(label='Task 1').first()
+        task6 = db.session.query(TaskTbl).filter_by(label='Task 6').first()
+        task7 = db.session.query(TaskTbl).filter_by(label='Task 7').first()
+
+        db.session.expire_all()
+        with count_statements() as statements:
+            # one task moved
+            self.assertEqual(self.task_api.reparent_tasks(task6.task_id, task7.task_id), True)
+            one_task = len(statements)
+
+            # subtree of 6 tasks moved
+            db.session.expire_all()
+            del statements[:]
+            self.assertEqual(self.task_api.reparent_tasks(task1.task_id, task7.task_id), True)
+            self.assertEqual(len(statements), one_task)
+
+        self.assertEqual(
+            [(row['label'], row['depth']) for row in self.task_api.get_tasks(expand=True)],
+            [('Task 2', 0), ('Task 7', 1), ('Task 6', 2), ('Task 1', 2), ('Task 3', 3), ('Task 8', 4), ('Task 4', 3),
+             ('Task 9', 4), ('Task 5', 3), ('Task 0', 0)]
+        )
+
+    def test_reads_without_objects(self):
+        self.create_tasks_set()
+        task_id = self.task_api.get_tasks(expand=False)[0]['task_id']
+        task_api = TaskApi(self.user.user_id, self.todolist.todolist_id)
+        db.session.expunge_all()
+
+        # task tree selects columns, no model objects are added to session
+        self.assertEqual(len(task_api.get_tasks(expand=True)), 10)
+        self.assertEqual(len(task_api.get_tasks(expand=False, task_id=task_id, limit=1)), 1)
+        self.assertEqual(list(db.session.identity_map.values()), [])
+
+        # write paths get objects
+        task = task_api.read_task_by_id(task_id)
+        self.assertIsInstance(task, TaskTbl)
+        self.assertEqual(task.to_dict(), task_api.get_tasks(expand=True)[0])
@@ -1,6 +1,8 @@
-from tests.base import IntegrationTestCase
+from uuid import uuid4
+from tests.base import IntegrationTestCase, count_statements
 from todos.models.api.user_api import UserApi
 from todos.models.definitions import db, RoleTbl, TodoListTbl
+from todos.models.pagination import encode
 
 
 class TodoListViewTests(IntegrationTestCase):
@@ -93,6 +95,16 @@ class TodoListViewTests(IntegrationTestCase):
         })
         self.assertEqual(result.status_code, 201)
 
+        # role is resolved once per request and shared by view and api
+        with count_statements() as statements:
+            result = self.client.post(f"/api/v1/tasks/{self.todolist.todolist_id}", json={
+                'label': 'List 2', 'status': 'active', 'priority': 'medium', 'parent_id': result.json['task_id']})
+            self.assertEqual(result.status_code, 201)
+            self.assertEqual(len([statement for statement in statements if 'FROM "UserTodoList"' in statement]), 1)
+            # created task is a leaf without looking up its children
+            self.assertEqual(result.json['is_leaf'], True)
+            self.assertEqual([statement for statement in statements if 'EXISTS' in statement], [])
+
         # not correct status
         result = self.client.post(f"/api/v1/tasks/{self.todolist.todolist_id}", json={
             'label': 'List 1',
@@ -175,6 +187,92 @@ class TodoListViewTests(IntegrationTestCase):
             ]
         )
 
+        # status changes included by default
+        for expand in ('true', 'false'):
+            result = self.client.get(f"/api/v1/tasks/{self.todolist.todolist_id}?expand={expand}")
+            self.assertEqual([row['status_changes'][0]['changed_by'] for row in result.json],
+                             ['Test User'] * len(result.json))
+
+            result = self.client.get(f"/api/v1/tasks/{self.todolist.todolist_id}?expand={expand}&history=false")
+            self.assertEqual(result.status_code, 200)
+            self.assertEqual([row for row in result.json if 'status_changes' in row], [])
+
+        # log out
+        self.client.get('/api/v1/logout')
+
+    def test_get_pages(self):
+        tasks = self.create_tasks_set()
+
+        # pages of expanded tree follow each other in dfs order
+        labels, after = list(), None
+        while True:
+            result = self.client.get(f"/api/v1/tasks/{self.todolist.todolist_id}",
+                                     query_string={'expand': 'true', 'limit': 3, 'after': after} if after
+                                     else {'expand': 'true', 'limit': 3})
+            self.assertEqual(result.status_code, 200)
+            labels.extend(row['label'] for row in result.json)
+            after = result.headers.get('X-Next-Cursor')
+            if not after:
+                break
+        self.assertEqual(labels, ['Task 2', 'Task 7', 'Task 0', 'Task 6', 'Task 1', 'Task 3', 'Task 8', 'Task 4',
+                                  'Task 9', 'Task 5'])
+
+        # pages of children of task
+        result = self.client.get(f"/api/v1/tasks/{self.todolist.todolist_id}?task_id={tasks[1]['task_id']}&limit=2")
+        self.assertEqual([row['label'] for row in result.json], ['Task 3', 'Task 4'])
+        result = self.client.get(f"/api/v1/tasks/{self.todolist.todolist_id}",
+                                 query_string={'task_id': tasks[1]['task_id'], 'limit': 2,
+                                               'after': result.headers['X-Next-Cursor']})
+        self.assertEqual([row['label'] for row in result.json], ['Task 5'])
+        self.assertNotIn('X-Next-Cursor', result.headers)
+
+        # deleted task of cursor is still sought by its sort key
+        result = self.client.get(f"/api/v1/tasks/{self.todolist.todolist_id}?task_id={tasks[1]['task_id']}&limit=1")
+        self.assertEqual([row['label'] for row in result.json], ['Task 3'])
+        children_after, task3_id = result.headers['X-Next-Cursor'], result.json[0]['task_id']
+        result = self.client.get(f"/api/v1/tasks/{self.todolist.todolist_id}?expand=true&limit=6")
+        self.assertEqual(result.json[-1]['label'], 'Task 3')
+        descendants_after = result.headers['X-Next-Cursor']
+        self.client.delete(f"/api/v1/tasks/{self.todolist.todolist_id}",
+                           query_string={'action': 'delete', 'task_id': task3_id})
+        result = self.client.get(f"/api/v1/tasks/{self.todolist.todolist_id}",
+                                 query_string={'task_id': tasks[1]['task_id'], 'after': children_after})
+        self.assertEqual([row['label'] for row in result.json], ['Task 4', 'Task 5'])
+        result = self.client.get(f"/api/v1/tasks/{self.todolist.todolist_id}",
+                                 query_string={'expand': 'true', 'after': descendants_after})
+        self.assertEqual([row['label'] for row in result.json], ['Task 4', 'Task 9', 'Task 5'])
+
+        # cursor of children is not valid for descendants
+        result = self.client.get(f"/api/v1/tasks/{self.todolist.todolist_id}",
+                                 query_string={'expand': 'true', 'after': children_after})
+        self.assertEqual(result.status_code, 400)
+
+        # ids are case insensitive and dashes are optional
+        todolist_id, task_id = self.todolist.todolist_id.upper(), tasks[1]['task_id'].replace('-', '')
+        result = self.client.get(f"/api/v1/tasks/{todolist_id}?task_id={task_id}&expand=true")
+        self.assertEqual([row['label'] for row in result.json], ['Task 4', 'Task 9', 'Task 5'])
+
+        # not valid ids
+        result = self.client.get(f"/api/v1/tasks/{self.todolist.todolist_id}?task_id=123")
+        self.assertEqual(result.status_code, 400)
+        result = self.client.get("/api/v1/tasks/123")
+        self.assertEqual(result.status_code, 404)
+
+        # not valid limit and cursor
+        result = self.client.get(f"/api/v1/tasks/{self.todolist.todolist_id}?limit=0")
+        self.assertEqual(result.status_code, 409)
+        result = self.client.get(f"/api/v1/tasks/{self.todolist.todolist_id}?after=abc")
+        self.assertEqual(result.status_code, 400)
+        result = self.client.get(f"/api/v1/tasks/{self.todolist.todolist_id}",
+                                 query_string={'expand': 'true',
+                                               'after': encode([['b', 1, 'Task', '2020-01-01T00:00:00', 'x']])})
+        self.assertEqual(result.status_code, 400)
+        for expand, after in (('false', encode(['b', 'active', 'Task', '2020-01-01T00:00:00', 'x'])),
+                              ('true', encode([['b', 'active', 'Task', '2020-01-01T00:00:00+02:00', str(uuid4())]]))):
+            result = self.client.get(f"/api/v1/tasks/{self.todolist.todolist_id}",
+                                     query_string={'expand': expand, 'after': after})
+            self.assertEqual(result.status_code, 400)
+
         # log out
         self.client.get('/api/v1/logout')
 
@@ -272,7 +370,9 @@ class TodoListViewTests(IntegrationTestCase):
             ]
         )
 
-        self.client.delete(f"/api/v1/tasks/{self.todolist.todolist_id}?action=purge")
+        result = self.client.delete(f"/api/v1/tasks/{self.todolist.todolist_id}?action=purge")
+        self.assertEqual(result.status_code, 200)
+        self.assertEqual(result.json, {'response': '4 tasks purged'})
         result = self.client.get(f"/api/v1/tasks/{self.todolist.todolist_id}?expand=true")
 
         # tree after purging
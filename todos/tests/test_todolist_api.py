@@ -1,8 +1,10 @@
 from uuid import uuid4
 from datetime import datetime
-from tests.base import TestCaseWithDB
-from todos.models.definitions import (db, UserTbl, TodoListTbl, RoleTbl, Priority, TodoListStatus)
+from tests.base import TestCaseWithDB, count_statements
+from todos.models.definitions import (db, UserTbl, TodoListTbl, UserTodoListTbl, RoleTbl, Priority, TodoListStatus)
 from todos.models.api.todolists_api import TodoListApi
+from todos.models.api.roles import RoleCache, todolist_role, forget_roles, reload_roles
+from todos.models.pagination import InvalidCursorError
 
 
 class TodoListApiTests(TestCaseWithDB):
@@ -68,6 +70,7 @@ class TodoListApiTests(TestCaseWithDB):
         # change limit to 1 of allowed todolists
         db.session.query(RoleTbl).filter_by(role='owner').update({'todolist_count_limit': 1})
         db.session.commit()
+        reload_roles()
         self.assertEqual(
             self.todolist_api.create_todolist({'label': 'List2', 'status': TodoListStatus.active.name,
                                                'priority': Priority.medium.value}),
@@ -81,6 +84,7 @@ class TodoListApiTests(TestCaseWithDB):
         # change limit to 10 of allowed todolists again
         db.session.query(RoleTbl).filter_by(role='owner').update({'todolist_count_limit': 10})
         db.session.commit()
+        reload_roles()
         todo = self.todolist_api.create_todolist({'label': 'List2', 'status': TodoListStatus.active.name,
                                                   'priority': Priority.medium.value})
         self.assertEqual(
@@ -281,3 +285,128 @@ class TodoListApiTests(TestCaseWithDB):
             [{'login': 'user1', 'role': 'owner'},
              {'login': 'user3', 'role': 'reader'}]
         )
+
+    def test_todolist_role(self):
+        todo = self.todolist_api.create_todolist({'label': 'List1', 'status': TodoListStatus.active.name,
+                                                  'priority': Priority.medium.value})
+        user2 = UserTbl(user_id=str(uuid4()), login='user2', password='abc123', name='Test User 2',
+                        email='user2@example.com', created=datetime.utcnow())
+        db.session.add(user2)
+        db.session.commit()
+        user_id, user2_id, todolist_id = self.user.user_id, user2.user_id, todo.todolist_id
+
+        with count_statements() as statements:
+            # role name is read by primary key once per request, limits come from the role cache
+            self.assertEqual(todolist_role(user_id, todolist_id).role, 'owner')
+            self.assertEqual(todolist_role(user_id, todolist_id).task_depth_limit, 10)
+            self.assertEqual(todolist_role(user2_id, todolist_id), None)
+            self.assertEqual(todolist_role(user2_id, todolist_id), None)
+            self.assertEqual(len(statements), 2)
+
+        # permissions changed by api apply at once
+        self.assertEqual(self.todolist_api.permissions(todolist_id, user2_id, 'reader'), True)
+        self.assertEqual(todolist_role(user2_id, todolist_id).role, 'reader')
+
+        # permissions changed directly in database, eg. by another worker, apply from the next request
+        db.session.query(UserTodoListTbl).filter_by(todolist_id=todolist_id, user_id=user2_id).delete()
+        db.session.commit()
+        self.assertEqual(todolist_role(user2_id, todolist_id).role, 'reader')
+        forget_roles()
+        self.assertEqual(todolist_role(user2_id, todolist_id), None)
+
+    def test_role_cache(self):
+        cache = RoleCache(ttl=300)
+        self.assertEqual(cache.get('owner').todolist_count_limit, 10)
+
+        # cached until reloaded
+        db.session.query(RoleTbl).filter_by(role='owner').update({'todolist_count_limit': 1})
+        db.session.commit()
+        self.assertEqual(cache.get('owner').todolist_count_limit, 10)
+        cache.reload()
+        self.assertEqual(cache.get('owner').todolist_count_limit, 1)
+
+        # reloaded after ttl
+        cache = RoleCache(ttl=0)
+        self.assertEqual(cache.get('admin').task_depth_limit, 8)
+        db.session.query(RoleTbl).filter_by(role='admin').update({'task_depth_limit': 5})
+        db.session.commit()
+        self.assertEqual(cache.get('admin').task_depth_limit, 5)
+        self.assertEqual(cache.get('unknown'), None)
+
+    def test_role_lookups(self):
+        self.create_todolist_set()
+        todo = db.session.query(TodoListTbl).filter_by(label='List 1').one()
+        user_id, todolist_id = self.user.user_id, todo.todolist_id
+
+        with count_statements() as statements:
+            # one query each by primary key of UserTodoList or its user_id prefix, relationships are not loaded
+            self.assertEqual(self.user.owner_todolist_count, 6)
+            self.assertEqual(todo.role(user_id), 'owner')
+            self.assertEqual(self.user.role(todolist_id), 'owner')
+            self.assertEqual(todo.role(str(uuid4())), None)
+            self.assertEqual(len(statements), 4)
+
+        indexes = {index.name: index for index in UserTodoListTbl.__table__.indexes}
+        self.assertEqual([column.name for column in indexes['ix_UserTodoList_todolist_id_role_user_id'].columns],
+                         ['todolist_id', 'role', 'user_id'])
+
+    def test_all_todolists_round_trips(self):
+        self.create_todolist_set()
+        db.session.expire_all()
+        user = db.session.query(UserTbl).filter_by(user_id=self.user.user_id).one()
+
+        with count_statements() as statements:
+            # todolists and their status changes
+            self.assertEqual(len(user.all_todolists()), 6)
+            self.assertEqual(len(statements), 2)
+
+            del statements[:]
+            self.assertEqual([row['label'] for row in user.all_todolists(status='active', history=False)],
+                             ['List 6', 'List 1', 'List 3', 'List 4'])
+            self.assertEqual(len(statements), 1)
+
+    def test_all_todolists_pages(self):
+        self.create_todolist_set()
+        # todolists with the same sort key differ by todolist_id
+        self.todolist_api.create_todolist({'label': 'List 3', 'status': TodoListStatus.active.name,
+                                           'priority': Priority.medium.value})
+        db.session.query(TodoListTbl).filter_by(label='List 3').update({'created_ts': datetime(2020, 1, 1)})
+        db.session.commit()
+
+        everything = self.user.all_todolists(history=False)
+        self.assertIsNone(everything.cursor)
+
+        for limit in range(1, 8):
+            pages = [self.user.all_todolists(history=False, limit=limit)]
+            while pages[-1].cursor:
+                pages.append(self.user.all_todolists(history=False, limit=limit, after=pages[-1].cursor))
+            self.assertTrue(all(len(page) <= limit for page in pages))
+            self.assertEqual([row['todolist_id'] for page in pages for row in page],
+                             [row['todolist_id'] for row in everything])
+
+        indexes = {index.name: index for index in TodoListTbl.__table__.indexes}
+        self.assertEqual(
+            [column.name for column in indexes['ix_TodoList_priority_status_label_created_ts_todolist_id'].columns],
+            ['priority', 'status', 'label', 'created_ts', 'todolist_id']
+        )
+
+        with self.assertRaises(InvalidCursorError):
+            self.user.all_todolists(limit=1, after='not a cursor')
+
+    def test_reads_without_objects(self):
+        self.create_todolist_set()
+        todolist_id = self.user.all_todolists()[0]['todolist_id']
+        db.session.expunge_all()
+
+        # list reads select columns, no model objects are added to session
+        todolist_api = TodoListApi(self.user.user_id)
+        self.assertEqual(len(todolist_api.get_todolists(filters={})), 6)
+        self.assertEqual(len(todolist_api.get_todolists(filters={}, limit=2)), 2)
+        self.assertEqual([row['todolist_id'] for row in todolist_api.get_todolists(todolist_id=todolist_id)],
+                         [todolist_id])
+        self.assertEqual(list(db.session.identity_map.values()), [])
+
+        # write paths get objects
+        todolist = todolist_api.read_todolist_by_id(todolist_id)
+        self.assertIsInstance(todolist, TodoListTbl)
+        self.assertEqual(todolist.to_dict(), todolist_api.get_todolists(todolist_id=todolist_id)[0])
@@ -1,6 +1,8 @@
+from uuid import uuid4
 from tests.base import IntegrationTestCase
 from todos.models.api.user_api import UserApi
 from todos.models.definitions import db, RoleTbl, TodoListTbl
+from todos.models.pagination import encode
 
 
 class TodoListViewTests(IntegrationTestCase):
@@ -102,6 +104,11 @@ class TodoListViewTests(IntegrationTestCase):
             ]
         )
 
+        # all todolists without status changes
+        result = self.client.get('/api/v1/todolists?history=false')
+        self.assertEqual(result.status_code, 200)
+        self.assertEqual([row for row in result.json if 'status_changes' in row], [])
+
         # all todolists filtered by priority medium
         result = self.client.get('/api/v1/todolists?priority=medium')
         self.assertEqual(result.status_code, 200)
@@ -154,6 +161,43 @@ class TodoListViewTests(IntegrationTestCase):
         # log out
         self.client.get('/api/v1/logout')
 
+    def test_get_pages(self):
+        self.create_todolist_set()
+
+        # pages of two todolists follow each other in order of all todolists
+        labels, after = list(), None
+        for page in range(3):
+            result = self.client.get('/api/v1/todolists', query_string={'limit': 2, 'after': after} if after
+                                     else {'limit': 2})
+            self.assertEqual(result.status_code, 200)
+            labels.extend(row['label'] for row in result.json)
+            after = result.headers.get('X-Next-Cursor')
+        self.assertEqual(labels, ['List 6', 'List 5', 'List 1', 'List 3', 'List 4', 'List 2'])
+        # the last page has no cursor
+        self.assertIsNone(after)
+
+        # pages of filtered todolists
+        result = self.client.get('/api/v1/todolists?priority=medium&limit=1')
+        self.assertEqual([row['label'] for row in result.json], ['List 3'])
+        result = self.client.get('/api/v1/todolists', query_string={'priority': 'medium', 'limit': 5,
+                                                                    'after': result.headers['X-Next-Cursor']})
+        self.assertEqual([row['label'] for row in result.json], ['List 4', 'List 2'])
+        self.assertNotIn('X-Next-Cursor', result.headers)
+
+        # not valid limit
+        for limit in ('0', '1001', 'abc'):
+            result = self.client.get(f"/api/v1/todolists?limit={limit}")
+            self.assertEqual(result.status_code, 409)
+
+        # not valid cursor
+        for after in ('abc', 'WzFd', 'eyJhIjogMX0=', encode(['b', 'active', 'List', '2020-01-01T00:00:00', 'x']),
+                      encode(['x', 'active', 'List', '2020-01-01T00:00:00', str(uuid4())])):
+            result = self.client.get('/api/v1/todolists', query_string={'after': after})
+            self.assertEqual(result.status_code, 400)
+
+        # log out
+        self.client.get('/api/v1/logout')
+
     def test_patch(self):
         self.create_todolist_set()
 
@@ -1,8 +1,10 @@
-from uuid import uuid4
+from uuid import uuid4, UUID
+from unittest import mock
 from datetime import datetime
 from tests.base import TestCaseWithDB
 from todos.models.definitions import (db, UserTbl, TodoListTbl, TodoListCreatorTbl, UserTodoListTbl, RoleTbl,
                                       Priority, TaskTbl)
+from todos.models.utils import dfs, TimeOrderedIds
 
 
 class SimpleDefTests(TestCaseWithDB):
@@ -284,3 +286,36 @@ class SimpleDefTests(TestCaseWithDB):
                 {'label': 'Task 12', 'priority': 'medium', 'status': 'active', 'depth': 1, 'is_leaf': True},
             ]
         )
+
+    def test_dfs(self):
+        # deep tree exceeding recursion limit
+        depth = 5000
+        children = {x: [x + 1] for x in range(depth)}
+        children[depth] = []
+        nodes = dfs([0], lambda node: children[node], key=lambda node: node)
+        self.assertEqual(next(nodes), 0)
+        self.assertEqual(sum(1 for _ in nodes), depth)
+
+        # preorder with children order kept, every node visited once
+        children = {'a': ['b', 'c'], 'b': ['d', 'c'], 'c': ['d'], 'd': []}
+        self.assertEqual(list(dfs(['a', 'c'], lambda node: children[node], key=lambda node: node)),
+                         ['a', 'b', 'd', 'c'])
+
+    def test_time_ordered_ids(self):
+        uuid7 = TimeOrderedIds()
+        ids = [uuid7() for x in range(10000)]
+        self.assertEqual(len(set(ids)), len(ids))
+        self.assertEqual([UUID(x).version for x in ids[:10]], [7] * 10)
+        # strictly increasing as strings and as stored bytes
+        self.assertEqual(sorted(ids), ids)
+        self.assertEqual(sorted(ids, key=lambda x: UUID(x).bytes), ids)
+
+        # the same millisecond, clock going back and counter overflow keep the order
+        uuid7 = TimeOrderedIds()
+        with mock.patch('time.time_ns', return_value=1700000000000 * 1000000):
+            ids = [uuid7() for x in range(5000)]
+        with mock.patch('time.time_ns', return_value=1600000000000 * 1000000):
+            ids.append(uuid7())
+        self.assertEqual(sorted(ids), ids)
+        self.assertEqual(len(set(ids)), len(ids))
+        self.assertEqual(int(UUID(ids[0]).hex[:12], 16), 1700000000000)
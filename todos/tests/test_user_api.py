@@ -1,7 +1,12 @@
+import time
 from uuid import uuid4
+from unittest import mock
 from datetime import datetime
-from tests.base import TestCaseWithDB
+from tests.base import TestCaseWithDB, count_statements
 from todos.models.api.user_api import UserApi
+from todos.models.api.user_cache import load_user, MemoryBackend, UserCache
+from todos import Todos
+from todos.models.passwords import password_context, verify_password
 from todos.models.definitions import db, UserTbl
 
 
@@ -125,3 +130,70 @@ class UserApiTests(TestCaseWithDB):
         self.user_api.delete_user(self.user_id)
         result = self.user_api.read_user_by_user_id(self.user_id)
         self.assertEqual(result, None)
+
+    def test_user_cache(self):
+        with count_statements() as statements:
+            # identity is read by primary key once and kept in process, roles are not loaded
+            self.assertEqual(load_user(self.user_id).login, 'user1')
+            self.assertEqual(load_user(self.user_id).name, 'Test User')
+            self.assertEqual(len(statements), 1)
+
+        # changes made by user api are seen at once, other changes after ttl
+        self.assertEqual(self.user_api.update_user(self.user_id, {'name': 'New Name'}), True)
+        self.assertEqual(load_user(self.user_id).name, 'New Name')
+        db.session.query(UserTbl).filter_by(user_id=self.user_id).update({'name': 'Other Name'})
+        db.session.commit()
+        self.assertEqual(load_user(self.user_id).name, 'New Name')
+        with mock.patch('todos.models.api.user_cache.time.monotonic', return_value=time.monotonic() + 5):
+            self.assertEqual(load_user(self.user_id).name, 'Other Name')
+        self.assertEqual(self.user_api.delete_user(self.user_id), True)
+        self.assertEqual(load_user(self.user_id), None)
+
+    def test_memory_backend(self):
+        backend = MemoryBackend(size=2, ttl=5)
+        backend.set('a', 1)
+        backend.set('b', 2)
+        self.assertEqual(backend.get('a'), 1)
+        # least recently used is dropped
+        backend.set('c', 3)
+        self.assertEqual((backend.get('a'), backend.get('b'), backend.get('c')), (1, None, 3))
+        backend.delete('a')
+        self.assertEqual(backend.get('a'), None)
+
+        self.assertEqual(UserCache.from_config({}).backend.size, 1000)
+        self.assertEqual(UserCache.from_config({'USER_CACHE_SIZE': '0'}).backend, None)
+
+    def test_authenticate(self):
+        self.assertEqual(self.user_api.authenticate('user1', 'abc123').user_id, self.user_id)
+        self.assertEqual(self.user_api.authenticate('user1', 'wrong'), None)
+        self.assertEqual(self.user_api.authenticate('nobody', 'abc123'), None)
+
+        # hash is updated on login when rounds change
+        context = UserTbl.__table__.c.password.type.context
+        rounds = context.to_dict()['pbkdf2_sha512__default_rounds']
+        context.update(pbkdf2_sha512__default_rounds=rounds + 1, pbkdf2_sha512__min_rounds=rounds + 1,
+                       pbkdf2_sha512__max_rounds=rounds + 1)
+        try:
+            self.assertEqual(self.user_api.authenticate('user1', 'abc123').user_id, self.user_id)
+            db.session.expire_all()
+            password = self.user_api.read_user_by_user_id(self.user_id).password
+            self.assertTrue(password.hash.startswith(f"$pbkdf2-sha512${rounds + 1}$".encode()))
+            self.assertTrue(password == 'abc123')
+        finally:
+            context.update(pbkdf2_sha512__default_rounds=rounds, pbkdf2_sha512__min_rounds=rounds,
+                           pbkdf2_sha512__max_rounds=rounds)
+
+    def test_password_settings_per_app(self):
+        other_app = Todos().app
+        other_app.extensions['passwords'] = password_context({'PASSWORD_ROUNDS': '1001'})
+
+        # each app hashes with its own rounds
+        with other_app.app_context():
+            other = UserTbl(password='abc123')
+            self.assertTrue(other.password.hash.startswith(b"$pbkdf2-sha512$1001$"))
+        user = UserTbl(password='abc123')
+        self.assertTrue(user.password.hash.startswith(b"$pbkdf2-sha512$1000$"))
+
+        # hash made by other app is updated to rounds of current app on login
+        self.assertTrue(verify_password(other.password, 'abc123'))
+        self.assertTrue(other.password.hash.startswith(b"$pbkdf2-sha512$1000$"))
@@ -1,5 +1,6 @@
 from tests.base import IntegrationTestCase
 from todos.models.api.user_api import UserApi
+from todos.models.definitions import UserTbl
 
 
 class UserViewTests(IntegrationTestCase):
@@ -104,6 +105,37 @@ class UserViewTests(IntegrationTestCase):
         # log out
         self.client.get('/api/v1/logout')
 
+    def test_patch_hashing(self):
+        context = UserTbl.__table__.c.password.type.context
+        calls = list()
+
+        def counted(name):
+            method = getattr(context, name)
+
+            def wrapper(*args, **kwargs):
+                calls.append(name)
+                return method(*args, **kwargs)
+            return wrapper
+
+        context.hash, context.verify_and_update = counted('hash'), counted('verify_and_update')
+        try:
+            # no hashing without password
+            result = self.client.patch('/api/v1/user', json={'name': 'User 1'})
+            self.assertEqual(result.status_code, 200)
+            self.assertEqual(calls, [])
+
+            # password is hashed once, also if unchanged
+            result = self.client.patch('/api/v1/user', json={'password': 'abc123'})
+            self.assertEqual(result.status_code, 200)
+            self.assertEqual(calls, ['hash'])
+        finally:
+            del context.hash, context.verify_and_update
+
+        self.assertEqual(self.user_api.read_user_by_login('user1').password, 'abc123')
+
+        # log out
+        self.client.get('/api/v1/logout')
+
     def test_patch_email(self):
         # check name before request
         user = self.user_api.read_user_by_login('user1')
@@ -1,4 +1,6 @@
-from flask import Blueprint, jsonify
+import json
+from hashlib import sha256
+from flask import Blueprint, current_app, request
 from apispec import APISpec
 from apispec_webframeworks.flask import FlaskPlugin
 from apispec.ext.marshmallow import MarshmallowPlugin
@@ -11,8 +13,8 @@ from .tasks import Task
 api_spec = Blueprint('api_spec', __name__, url_prefix='/api/v1')
 
 
-@api_spec.route('/', methods=['GET'])
-def get():
+def build_spec():
+    """Returns OpenAPI document of all views, needs app context to resolve view urls"""
     spec = APISpec(
         title="Todos",
         version="0.1.0",
@@ -35,4 +37,40 @@ def get():
     spec.path(view=Task.view)
     spec.path(view=Task.reparent_view)
 
-    return jsonify(spec.to_dict())
+    return spec.to_dict()
+
+
+class ApiSpec:
+    """
+    OpenAPI document built once per app on the first use, docstrings and schemas don't change at runtime.
+    It is kept as json bytes with etag of their content, so repeated requests are answered without work.
+    """
+
+    def __init__(self, max_age=3600):
+        self.max_age = max_age
+        self._document = None
+
+    @property
+    def document(self):
+        if self._document is None:
+            content = json.dumps(build_spec(), sort_keys=True, separators=(',', ':')).encode('utf8')
+            self._document = (content, sha256(content).hexdigest())
+        return self._document
+
+    @property
+    def content(self):
+        return self.document[0]
+
+    @property
+    def etag(self):
+        return self.document[1]
+
+
+@api_spec.route('/', methods=['GET'])
+def get():
+    spec = current_app.extensions['api_spec']
+    response = current_app.response_class(spec.content, mimetype='application/json')
+    response.set_etag(spec.etag)
+    response.cache_control.public = True
+    response.cache_control.max_age = spec.max_age
+    return response.make_conditional(request)
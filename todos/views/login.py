@@ -50,8 +50,8 @@ class Login(MethodView):
             return jsonify({'error': errors}), 409
 
         logger.info(f"Getting {request.url} using {request.method} user {schema['login']}")
-        user = user_api.read_user_by_login(schema['login'])
-        if user and user.is_authenticated(**schema):
+        user = user_api.authenticate(**schema)
+        if user:
             login_user(user, remember=True)
             return jsonify(user.to_dict()), 200
 
@@ -4,6 +4,9 @@ from flask.views import MethodView
 from flask_login import current_user, login_required
 from todos.schemas.tasks import TaskPost, TaskGet, TaskPatch, TaskOK, TaskError # noqa
 from todos.models.api.tasks_api import TaskApi
+from todos.models.api.roles import todolist_role
+from todos.models.pagination import InvalidCursorError
+from tools import boolean, page_limit, uuid_param
 
 # logger
 logger = logging.getLogger('todos')
@@ -37,33 +40,85 @@ class Task(MethodView):
               type: string
               format: uuid
               example: 00000000-0000-0000-0000-000000000000
+          - name: history
+            in: query
+            description: "Include status changes, true by default"
+            schema:
+              type: boolean
+          - name: limit
+            in: query
+            description: "Maximal number of tasks in response, all tasks by default"
+            schema:
+              type: integer
+              minimum: 1
+              maximum: 1000
+          - name: after
+            in: query
+            description: "Cursor from X-Next-Cursor header of previous page"
+            schema:
+              type: string
         responses:
           '200':
             description: "Successful operation"
+            headers:
+              X-Next-Cursor:
+                description: "Cursor of the next page, missing on the last page"
+                schema:
+                  type: string
             content:
               application/json:
                 schema: TaskGet
+          '400':
+            description: "Not valid cursor or task_id"
+            content:
+              application/json:
+                schema: TaskError
           '404':
             description: "No task available or no access to todolist"
             content:
               application/json:
                 schema: TaskError
+          '409':
+            description: "Not valid limit"
+            content:
+              application/json:
+                schema: TaskError
         """
         logged_user_id = current_user.user_id
 
-        if not current_user.role(todolist_id):
+        role = todolist_role(logged_user_id, todolist_id)
+        if not role:
             return jsonify({'error': 'User with no access to todolist'}), 404
 
         # additional query params
         expand = request.args.get('expand', default=None)
-        task_id = request.args.get('task_id', default=None)
-
-        task_api = TaskApi(logged_user_id, todolist_id)
-        data = task_api.get_tasks(boolean(expand), task_id)
+        history = request.args.get('history', default=None)
+        try:
+            task_id = uuid_param(request.args.get('task_id', default=None))
+        except ValueError:
+            logger.error(f"Getting {request.url} using {request.method}, not valid task_id")
+            return jsonify({'error': 'Not valid task_id'}), 400
+
+        # pagination
+        try:
+            limit = page_limit(request.args.get('limit', default=None))
+        except ValueError as e:
+            logger.error(f"Getting {request.url} using {request.method}, errors: {e}")
+            return jsonify({'error': 'Not valid limit'}), 409
+        after = request.args.get('after', default=None)
+
+        task_api = TaskApi(logged_user_id, todolist_id, role)
+        try:
+            data = task_api.get_tasks(boolean(expand), task_id, history=boolean(history) is not False,
+                                      limit=limit, after=after)
+        except InvalidCursorError:
+            logger.error(f"Getting {request.url} using {request.method}, not valid cursor")
+            return jsonify({'error': 'Not valid cursor'}), 400
         logger.info(f"Getting {request.url} using {request.method}")
 
         if data:
-            return jsonify(data), 200
+            headers = {'X-Next-Cursor': data.cursor} if data.cursor else {}
+            return jsonify(data), 200, headers
         else:
             return jsonify({'error': 'No list available'}), 404
 
@@ -110,12 +165,13 @@ class Task(MethodView):
         """
         logged_user_id = current_user.user_id
 
-        if not current_user.role(todolist_id):
+        role = todolist_role(logged_user_id, todolist_id)
+        if not role:
             logger.error(f"Getting {request.url} using {request.method}, user {current_user.login} "
                          f"with no access to todolist {todolist_id}")
             return jsonify({'error': 'No permission to access todolist'}), 403
 
-        if current_user.role(todolist_id) == 'reader':
+        if role.role == 'reader':
             logger.error(f"Getting {request.url} using {request.method}, user {current_user.login} "
                          f"with no permission to create task")
             return jsonify({'error': 'No permission to create task'}), 403
@@ -125,7 +181,7 @@ class Task(MethodView):
             logger.error(f"Getting {request.url} using {request.method}, errors: {errors}")
             return jsonify({'error': errors}), 409
 
-        task_api = TaskApi(logged_user_id, todolist_id)
+        task_api = TaskApi(logged_user_id, todolist_id, role)
         task = task_api.create_task(schema)
 
         if task is None:
@@ -135,7 +191,8 @@ class Task(MethodView):
             logger.error(f"Getting {request.url} with {request.method}, limit exceeded")
             return jsonify({'error': 'Limit exceeded'}), 403
 
-        return jsonify(task.to_dict()), 201
+        # created task has no children yet
+        return jsonify(task.to_dict(is_leaf=True)), 201
 
     @login_required # noqa
     def patch(self, todolist_id, task_id):
@@ -186,12 +243,13 @@ class Task(MethodView):
         """
         logged_user_id = current_user.user_id
 
-        if not current_user.role(todolist_id):
+        role = todolist_role(logged_user_id, todolist_id)
+        if not role:
             logger.error(f"Getting {request.url} using {request.method}, user {current_user.login} "
                          f"with no access to todolist {todolist_id}")
             return jsonify({'error': 'No permission to access todolist'}), 403
 
-        if current_user.role(todolist_id) == 'reader':
+        if role.role == 'reader':
             logger.error(f"Getting {request.url} using {request.method}, user {current_user.login} "
                          f"with no permission to create task")
             return jsonify({'error': 'No permission to create task'}), 403
@@ -203,7 +261,7 @@ class Task(MethodView):
         if not schema:
             return jsonify({'error': 'Request with no data to change'}), 400
 
-        task_api = TaskApi(logged_user_id, todolist_id)
+        task_api = TaskApi(logged_user_id, todolist_id, role)
         task = task_api.read_task_by_id(task_id)
 
         to_change = dict()
@@ -266,7 +324,7 @@ class Task(MethodView):
               application/json:
                 schema: TaskOK
           '400':
-            description: "Database error"
+            description: "Not valid task_id or database error"
             content:
               application/json:
                 schema: TaskError
@@ -283,40 +341,46 @@ class Task(MethodView):
         """
         logged_user_id = current_user.user_id
 
-        if not current_user.role(todolist_id):
+        role = todolist_role(logged_user_id, todolist_id)
+        if not role:
             logger.error(f"Getting {request.url} using {request.method}, user {current_user.login} "
                          f"with no access to todolist {todolist_id}")
             return jsonify({'error': 'No permission to access todolist'}), 403
 
-        if current_user.role(todolist_id) == 'reader':
+        if role.role == 'reader':
             logger.error(f"Getting {request.url} using {request.method}, user {current_user.login} "
                          f"with no permission to create task")
             return jsonify({'error': 'No permission to create task'}), 403
 
-        task_api = TaskApi(logged_user_id, todolist_id)
+        task_api = TaskApi(logged_user_id, todolist_id, role)
 
         action = request.args.get('action', default=None)
-        task_id = request.args.get('task_id', default=None)
+        try:
+            task_id = uuid_param(request.args.get('task_id', default=None))
+        except ValueError:
+            logger.error(f"Getting {request.url} using {request.method}, not valid task_id")
+            return jsonify({'error': 'Not valid task_id'}), 400
         logger.info(f"Getting {request.url} using {request.method}")
 
         if action == 'purge':
-            deleted = task_api.purge_tasks()
-        else:
-            if not task_id:
-                logger.error(f"Getting {request.url} using {request.method}: "
-                             f"task_id cannot be null when action {action}")
-                return jsonify({'error': f"task_id cannot be null"}), 409
-            task = task_api.read_task_by_id(task_id)
-            deleted = task_api.delete_task(task_id)
+            purged = task_api.purge_tasks()
+            if purged is None:
+                logger.error(f"Getting {request.url} with {request.method}, database error")
+                return jsonify({'error': f"Database error"}), 400
+            return jsonify({'response': f"{purged} tasks purged"}), 200
+
+        if not task_id:
+            logger.error(f"Getting {request.url} using {request.method}: "
+                         f"task_id cannot be null when action {action}")
+            return jsonify({'error': f"task_id cannot be null"}), 409
+        task = task_api.read_task_by_id(task_id)
+        deleted = task_api.delete_task(task_id)
 
         if not deleted:
             logger.error(f"Getting {request.url} with {request.method}, database error")
             return jsonify({'error': f"Database error"}), 400
 
-        if action == 'purge':
-            return jsonify({'response': f"Tasks purged"}), 200
-        else:
-            return jsonify({'response': f"Task {task.label} deleted"}), 200
+        return jsonify({'response': f"Task {task.label} deleted"}), 200
 
     @login_required # noqa
     def put(self, todolist_id, task_id):
@@ -351,7 +415,7 @@ class Task(MethodView):
               application/json:
                 schema: TaskOK
           '400':
-            description: "Request with no data to change"
+            description: "Request with no data to change or not valid new_parent_id"
             content:
               application/json:
                 schema: TaskError
@@ -368,21 +432,26 @@ class Task(MethodView):
         """
         logged_user_id = current_user.user_id
 
-        if not current_user.role(todolist_id):
+        role = todolist_role(logged_user_id, todolist_id)
+        if not role:
             logger.error(f"Getting {request.url} using {request.method}, user {current_user.login} "
                          f"with no access to todolist {todolist_id}")
             return jsonify({'error': 'No permission to access todolist'}), 403
 
-        if current_user.role(todolist_id) == 'reader':
+        if role.role == 'reader':
             logger.error(f"Getting {request.url} using {request.method}, user {current_user.login} "
                          f"with no permission to create task")
             return jsonify({'error': 'No permission to create task'}), 403
 
         logger.info(f"Getting {request.url} using {request.method}")
-        new_parent_id = request.args.get('new_parent_id', default=None)
+        try:
+            new_parent_id = uuid_param(request.args.get('new_parent_id', default=None))
+        except ValueError:
+            logger.error(f"Getting {request.url} using {request.method}, not valid new_parent_id")
+            return jsonify({'error': 'Not valid new_parent_id'}), 400
 
         # check task
-        task_api = TaskApi(logged_user_id, todolist_id)
+        task_api = TaskApi(logged_user_id, todolist_id, role)
         task = task_api.read_task_by_id(task_id)
 
         updated = task_api.reparent_tasks(task_id, new_parent_id)
@@ -400,18 +469,14 @@ class Task(MethodView):
     @classmethod
     def register(cls):
         cls.collection_view = cls.as_view('tasks')
-        task_bp.add_url_rule('/<todolist_id>', view_func=cls.collection_view, methods=['GET', 'POST', 'DELETE'],
-                             provide_automatic_options=True)
+        task_bp.add_url_rule('/<uuid:todolist_id>', view_func=cls.collection_view,
+                             methods=['GET', 'POST', 'DELETE'], provide_automatic_options=True)
         cls.view = cls.as_view('task')
-        task_bp.add_url_rule('/<todolist_id>/<task_id>', methods=['PATCH'], view_func=cls.view,
+        task_bp.add_url_rule('/<uuid:todolist_id>/<uuid:task_id>', methods=['PATCH'], view_func=cls.view,
                              provide_automatic_options=True)
         cls.reparent_view = cls.as_view('reparent')
-        task_bp.add_url_rule('/reparent/<todolist_id>/<task_id>', methods=['PUT'], view_func=cls.reparent_view,
-                             provide_automatic_options=True)
+        task_bp.add_url_rule('/reparent/<uuid:todolist_id>/<uuid:task_id>', methods=['PUT'],
+                             view_func=cls.reparent_view, provide_automatic_options=True)
 
 
 Task.register()
-
-
-def boolean(val):
-    return True if val == 'true' else False if val == 'false' else None
@@ -6,6 +6,9 @@ from flask_login import current_user, login_required
 from todos.schemas.todolists import TodoListPatch, TodoListPost, TodoListError, TodoListOK, TodoListGet # noqa
 from todos.models.api.todolists_api import TodoListApi
 from todos.models.api.user_api import UserApi
+from todos.models.api.roles import todolist_role
+from todos.models.pagination import InvalidCursorError
+from tools import boolean, page_limit, uuid_param
 
 # logger
 logger = logging.getLogger('todos')
@@ -43,17 +46,49 @@ class TodoList(MethodView):
             schema:
               type: string
               enum: [veryhigh, high, medium, low, verylow]
+          - name: history
+            in: query
+            description: "Include status changes, true by default"
+            schema:
+              type: boolean
+          - name: limit
+            in: query
+            description: "Maximal number of todolists in response, all todolists by default"
+            schema:
+              type: integer
+              minimum: 1
+              maximum: 1000
+          - name: after
+            in: query
+            description: "Cursor from X-Next-Cursor header of previous page"
+            schema:
+              type: string
         responses:
           '200':
             description: "Successful operation"
+            headers:
+              X-Next-Cursor:
+                description: "Cursor of the next page, missing on the last page"
+                schema:
+                  type: string
             content:
               application/json:
                 schema: TodoListGet
+          '400':
+            description: "Not valid cursor or todolist_id"
+            content:
+              application/json:
+                schema: TodoListError
           '404':
             description: "No list available"
             content:
               application/json:
                 schema: TodoListError
+          '409':
+            description: "Not valid limit"
+            content:
+              application/json:
+                schema: TodoListError
         """
         logged_user_id = current_user.user_id
 
@@ -63,14 +98,33 @@ class TodoList(MethodView):
         filters['priority'] = request.args.get('priority', default=None)
 
         # todolist
-        todolist_id = request.args.get('todolist_id', default=None)
+        history = request.args.get('history', default=None)
+        try:
+            todolist_id = uuid_param(request.args.get('todolist_id', default=None))
+        except ValueError:
+            logger.error(f"Getting {request.url} using {request.method}, not valid todolist_id")
+            return jsonify({'error': 'Not valid todolist_id'}), 400
+
+        # pagination
+        try:
+            limit = page_limit(request.args.get('limit', default=None))
+        except ValueError as e:
+            logger.error(f"Getting {request.url} using {request.method}, errors: {e}")
+            return jsonify({'error': 'Not valid limit'}), 409
+        after = request.args.get('after', default=None)
 
         todolist_api = TodoListApi(logged_user_id)
-        data = tuple(todolist_api.get_todolists(todolist_id=todolist_id, filters=filters))
+        try:
+            data = todolist_api.get_todolists(todolist_id=todolist_id, filters=filters,
+                                              history=boolean(history) is not False, limit=limit, after=after)
+        except InvalidCursorError:
+            logger.error(f"Getting {request.url} using {request.method}, not valid cursor")
+            return jsonify({'error': 'Not valid cursor'}), 400
         logger.info(f"Getting {request.url} using {request.method}")
 
         if data:
-            return jsonify(data), 200
+            headers = {'X-Next-Cursor': data.cursor} if getattr(data, 'cursor', None) else {}
+            return jsonify(data), 200, headers
         else:
             return jsonify({'error': 'No list available'}), 404
 
@@ -176,12 +230,13 @@ class TodoList(MethodView):
         """
         logged_user_id = current_user.user_id
 
-        if not current_user.role(todolist_id):
+        role = todolist_role(logged_user_id, todolist_id)
+        if not role:
             logger.error(f"Getting {request.url} using {request.method}, user {current_user.login} "
                          f"with no access to todolist {todolist_id}")
             return jsonify({'error': 'User with no access to todolist'}), 404
 
-        if current_user.role(todolist_id) == 'reader':
+        if role.role == 'reader':
             logger.error(f"Getting {request.url} using {request.method}, user {current_user.login} "
                          f"has got no permission to update todolist {todolist_id}")
             return jsonify({'error': 'No permission for updating todolist'}), 403
@@ -259,12 +314,13 @@ class TodoList(MethodView):
         """
         logged_user_id = current_user.user_id
 
-        if not current_user.role(todolist_id):
+        role = todolist_role(logged_user_id, todolist_id)
+        if not role:
             logger.error(f"Getting {request.url} using {request.method}, user {current_user.login} "
                          f"with no access to todolist {todolist_id}")
             return jsonify({'error': 'User with no access to todolist'}), 404
 
-        if current_user.role(todolist_id) != 'owner':
+        if role.role != 'owner':
             logger.error(f"Getting {request.url} using {request.method}, user {current_user.login} "
                          f"has got no permission to delete todolist {todolist_id}")
             return jsonify({'error': 'No permission for deleting todolist'}), 403
@@ -344,12 +400,13 @@ class TodoList(MethodView):
             return jsonify({'error': 'No user logged in'}), 401
         logged_user_id = current_user.user_id
 
-        if not current_user.role(todolist_id):
+        role = todolist_role(logged_user_id, todolist_id)
+        if not role:
             logger.error(f"Getting {request.url} using {request.method}, user {current_user.login} "
                          f"with no access to todolist {todolist_id}")
             return jsonify({'error': 'User with no access to todolist'}), 404
 
-        if current_user.role(todolist_id) != 'owner':
+        if role.role != 'owner':
             logger.error(f"Getting {request.url} using {request.method}, user {current_user.login} "
                          f"has got no permission to update todolist {todolist_id}")
             return jsonify({'error': 'No permission for updating todolist'}), 403
@@ -391,11 +448,11 @@ class TodoList(MethodView):
         todolist_bp.add_url_rule('', view_func=cls.collection_view, methods=['GET', 'POST'],
                                  provide_automatic_options=True)
         cls.view = cls.as_view('todolist')
-        todolist_bp.add_url_rule('/<todolist_id>', methods=['PATCH', 'DELETE'], view_func=cls.view,
+        todolist_bp.add_url_rule('/<uuid:todolist_id>', methods=['PATCH', 'DELETE'], view_func=cls.view,
                                  provide_automatic_options=True)
         cls.permission_view = cls.as_view('permissions')
-        todolist_bp.add_url_rule('/permissions/<todolist_id>/<email>', methods=['PUT'], view_func=cls.permission_view,
-                                 provide_automatic_options=True)
+        todolist_bp.add_url_rule('/permissions/<uuid:todolist_id>/<email>', methods=['PUT'],
+                                 view_func=cls.permission_view, provide_automatic_options=True)
 
 
 TodoList.register()
@@ -137,7 +137,8 @@ class User(MethodView):
 
         to_change = dict()
 
-        if schema.get('password', None) and schema['password'] != userdb.password:
+        # comparing with stored hash costs as much as hashing the new password, so it is just hashed once
+        if schema.get('password', None):
             to_change['password'] = schema['password']
 
         if schema.get('name', None) and schema['name'] != userdb.name:
@@ -1,3 +1,3 @@
-from .utils import timer
+from .utils import timer, boolean, page_limit, uuid_param, UUIDConverter
 
-__all__ = ['timer']
+__all__ = ['timer', 'boolean', 'page_limit', 'uuid_param', 'UUIDConverter']
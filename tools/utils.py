@@ -1,6 +1,8 @@
 import time
 import logging
 from functools import wraps
+from uuid import UUID
+from werkzeug.routing import BaseConverter
 
 logger = logging.getLogger('todos')
 
@@ -19,3 +21,42 @@ def timer(func):
                     f' with duration time {duration:.3f}s')
         return ret_val
     return wrapper
+
+
+def boolean(val):
+    """
+    Converts query parameter to boolean, None if not provided or not valid
+    """
+    return True if val == 'true' else False if val == 'false' else None
+
+
+def page_limit(val, maximum=1000):
+    """
+    Converts limit query parameter to int, None if not provided, raises ValueError if not in 1..maximum
+    """
+    if val is None:
+        return None
+    limit = int(val)
+    if not 1 <= limit <= maximum:
+        raise ValueError(f"limit should be between 1 and {maximum}")
+    return limit
+
+
+def uuid_param(val):
+    """
+    Converts id query parameter to canonical uuid string, None if not provided, raises ValueError if not valid
+    """
+    if val is None:
+        return None
+    return str(UUID(val))
+
+
+class UUIDConverter(BaseConverter):
+    """
+    Converts id path parameter to canonical uuid string, so ids with capital letters or without dashes
+    match ids read from database. Path parameters which are not uuids don't match the route.
+    """
+    regex = r'[0-9A-Fa-f]{8}-?[0-9A-Fa-f]{4}-?[0-9A-Fa-f]{4}-?[0-9A-Fa-f]{4}-?[0-9A-Fa-f]{12}'
+
+    def to_python(self, value):
+        return str(UUID(value))